@@ -0,0 +1,50 @@
+# access_log.py - Journal d'accès structuré (JSON), écrit hors du thread de la requête
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Paramètres de requête jamais écrits en clair
+REDACTED_KEYS = {'password', 'token', 'access_token', 'jwt', 'secret'}
+MAX_VALUE_LENGTH = 200
+
+
+def redact(args):
+    """Copy query args with secrets masked and long values truncated."""
+    result = {}
+    for key, value in args.items():
+        if key.lower() in REDACTED_KEYS:
+            value = '[redacted]'
+        elif len(value) > MAX_VALUE_LENGTH:
+            value = value[:MAX_VALUE_LENGTH] + f'...[{len(value)} chars]'
+        result[key] = value
+    return result
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records carrying an `access` dict as one JSON object per line."""
+
+    def format(self, record):
+        entry = {'time': self.formatTime(record), 'level': record.levelname}
+        entry.update(getattr(record, 'access', None) or {'message': record.getMessage()})
+        return json.dumps(entry, default=str)
+
+
+def setup_access_logger(name='portfolio.access', stream=None):
+    """Attach a QueueHandler to the access logger and start its listener thread.
+
+    The request thread only enqueues the record; JSON formatting and the
+    write happen in the listener. Returns (logger, listener).
+    """
+    records = queue.SimpleQueue()
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+
+    logger = logging.getLogger(name)
+    logger.handlers[:] = [logging.handlers.QueueHandler(records)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    return logger, listener
@@ -1,16 +1,55 @@
 # app.py
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, send_file, url_for, redirect, make_response, has_request_context, g, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 from flask_cors import CORS, cross_origin
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects import postgresql, sqlite
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import timedelta
+from werkzeug.formparser import parse_form_data
+from werkzeug.security import safe_join
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.wsgi import LimitedStream, wrap_file
+from datetime import timedelta, datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps, lru_cache
+from contextlib import contextmanager
+from collections import Counter
+import hashlib
+import hmac
+from urllib.parse import urlencode
 import os
-import smtplib
+import time
+import random
+import logging
+import threading
+import click
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
+import re
+import json
+import base64
+import binascii
+import io
+import mimetypes
+import storage
+import cache
+import snapshots
+import mailer
+import access_log
+import search
+import dbpool
+import metrics
+import jsonstream
+import serializers
+import ratelimit
+import compression
 
 # Load environment variables
 load_dotenv()
@@ -21,11 +60,40 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URI', 'sqlite:///portfolio.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool de connexions, par processus (donc par worker gunicorn) : ignoré pour SQLite
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+# Connexions recyclées avant que le serveur ou un proxy ne les coupe pour inactivité
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', 'True').lower() in ('true', '1', 't')
+app.config['DB_CONNECT_TIMEOUT'] = int(os.environ.get('DB_CONNECT_TIMEOUT', 10))
+app.config['DB_STATEMENT_TIMEOUT_MS'] = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=1)
 # Configuration JWT
 app.config['JWT_ERROR_MESSAGE_KEY'] = 'message'
 app.config['JWT_DECODE_COMPLETE'] = False
+# Durée (s) pendant laquelle la version de jeton d'un admin est gardée en mémoire
+app.config['TOKEN_VERSION_TTL'] = int(os.environ.get('TOKEN_VERSION_TTL', 30))
+
+# Hachage des mots de passe (format Werkzeug) : un compte haché avec un autre coût
+# est re-haché à sa prochaine connexion réussie
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+app.config['PASSWORD_SALT_LENGTH'] = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+# Nombre de proxys de confiance devant l'application (nginx, routeur PaaS) : l'adresse du
+# client est lue dans X-Forwarded-For (limiteurs, journal d'accès). 0 : REMOTE_ADDR tel quel
+app.config['TRUSTED_PROXIES'] = int(os.environ.get('TRUSTED_PROXIES', 0))
+# Tentatives de connexion (seau à jetons) par IP et par nom d'utilisateur : local, shared (Redis), fake ou none
+app.config['LOGIN_RATE_LIMIT'] = os.environ.get('LOGIN_RATE_LIMIT', 'local')
+app.config['LOGIN_RATE_LIMIT_URL'] = os.environ.get('LOGIN_RATE_LIMIT_URL')
+app.config['LOGIN_IP_BURST'] = int(os.environ.get('LOGIN_IP_BURST', 10))
+app.config['LOGIN_IP_PER_MINUTE'] = float(os.environ.get('LOGIN_IP_PER_MINUTE', 5))
+app.config['LOGIN_USER_BURST'] = int(os.environ.get('LOGIN_USER_BURST', 5))
+app.config['LOGIN_USER_PER_MINUTE'] = float(os.environ.get('LOGIN_USER_PER_MINUTE', 2))
+
+# Proportion des requêtes réussies écrites dans le journal d'accès (0 à 1)
+app.config['ACCESS_LOG_SAMPLE_RATE'] = float(os.environ.get('ACCESS_LOG_SAMPLE_RATE', 0.1))
 
 # Email configuration
 app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER')
@@ -35,11 +103,126 @@ app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
 app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', 'True').lower() in ('true', '1', 't')
 app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER')
 app.config['ADMIN_EMAIL'] = os.environ.get('ADMIN_EMAIL')
+# File d'envoi des emails : thread dans chaque worker, ou none si `flask send-emails` tourne à part
+app.config['MAIL_QUEUE_WORKER'] = os.environ.get('MAIL_QUEUE_WORKER', 'thread')
+app.config['MAIL_BATCH_SIZE'] = int(os.environ.get('MAIL_BATCH_SIZE', 20))
+app.config['MAIL_MAX_ATTEMPTS'] = int(os.environ.get('MAIL_MAX_ATTEMPTS', 5))
+app.config['MAIL_RETRY_DELAY'] = int(os.environ.get('MAIL_RETRY_DELAY', 30))
+app.config['MAIL_POLL_INTERVAL'] = int(os.environ.get('MAIL_POLL_INTERVAL', 60))
+
+# Formulaire de contact : envois par IP et par email (fenêtre glissante) : local, shared (Redis), fake ou none
+app.config['CONTACT_RATE_LIMIT'] = os.environ.get('CONTACT_RATE_LIMIT', 'local')
+app.config['CONTACT_RATE_LIMIT_URL'] = os.environ.get('CONTACT_RATE_LIMIT_URL')
+app.config['CONTACT_IP_LIMIT'] = int(os.environ.get('CONTACT_IP_LIMIT', 5))
+app.config['CONTACT_IP_WINDOW'] = int(os.environ.get('CONTACT_IP_WINDOW', 600))
+app.config['CONTACT_EMAIL_LIMIT'] = int(os.environ.get('CONTACT_EMAIL_LIMIT', 3))
+app.config['CONTACT_EMAIL_WINDOW'] = int(os.environ.get('CONTACT_EMAIL_WINDOW', 3600))
+# Un message identique (après normalisation) reçu dans cet intervalle (s) n'est pas réenregistré
+app.config['CONTACT_DUPLICATE_WINDOW'] = int(os.environ.get('CONTACT_DUPLICATE_WINDOW', 600))
+# Champ caché du formulaire : s'il est rempli, l'envoi vient d'un robot
+app.config['CONTACT_HONEYPOT_FIELD'] = os.environ.get('CONTACT_HONEYPOT_FIELD', 'website')
+app.config['CONTACT_MAX_MESSAGE_LENGTH'] = int(os.environ.get('CONTACT_MAX_MESSAGE_LENGTH', 5000))
+app.config['CONTACT_MAX_BODY_SIZE'] = int(os.environ.get('CONTACT_MAX_BODY_SIZE', 16 * 1024))
+
+# Stockage des images (adressées par leur SHA-256)
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', os.path.join(app.instance_path, 'uploads'))
+# Taille maximale (octets) d'une image envoyée en multipart sur /api/images
+app.config['MAX_IMAGE_SIZE'] = int(os.environ.get('MAX_IMAGE_SIZE', 10 * 1024 * 1024))
+# Largeurs (px) des variantes redimensionnées générées pour chaque image
+app.config['IMAGE_VARIANT_WIDTHS'] = [int(w) for w in os.environ.get('IMAGE_VARIANT_WIDTHS', '320,640,1280').split(',')]
+app.config['IMAGE_WORKERS'] = int(os.environ.get('IMAGE_WORKERS', 2))
+
+# Cache des réponses publiques : local (par worker), shared (Redis), fake ou none
+app.config['RESPONSE_CACHE'] = os.environ.get('RESPONSE_CACHE', 'local')
+app.config['RESPONSE_CACHE_URL'] = os.environ.get('RESPONSE_CACHE_URL')
+app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 256))
+# Taille totale des corps gardés par le cache local, par worker
+app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+# Corps plus gros : envoyés sans être mis en cache (ni gardés en mémoire pour lui)
+app.config['RESPONSE_CACHE_MAX_ENTRY_SIZE'] = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRY_SIZE', 1024 * 1024))
+
+# Réponses JSON pré-générées (et pré-compressées) à chaque modification du contenu
+app.config['SNAPSHOTS'] = os.environ.get('SNAPSHOTS', 'True').lower() in ('true', '1', 't')
+app.config['SNAPSHOT_FOLDER'] = os.environ.get('SNAPSHOT_FOLDER', os.path.join(app.instance_path, 'snapshots'))
+# URL publique de l'API utilisée pour les URLs d'images (par défaut celle de la requête admin)
+app.config['SNAPSHOT_BASE_URL'] = os.environ.get('SNAPSHOT_BASE_URL')
+
+# Budget de requêtes SQL par route (@query_budget) : off, warn (log) ou raise (erreur 500)
+app.config['QUERY_BUDGET'] = os.environ.get('QUERY_BUDGET', 'off').lower()
+# Une même instruction SQL répétée autant de fois dans une requête est signalée (N+1)
+app.config['QUERY_REPEAT_THRESHOLD'] = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 3))
+
+# Compression gzip/brotli (selon Accept-Encoding) des réponses JSON d'au moins COMPRESS_MIN_SIZE octets
+app.config['COMPRESS_RESPONSES'] = os.environ.get('COMPRESS_RESPONSES', 'True').lower() in ('true', '1', 't')
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+
+# Si défini, /metrics exige l'en-tête Authorization: Bearer <METRICS_TOKEN>
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+
+# Import / export NDJSON : lignes insérées (et lues) par lots de cette taille
+app.config['BULK_BATCH_SIZE'] = int(os.environ.get('BULK_BATCH_SIZE', 500))
+
+# Logs applicatifs, et journal d'accès écrit par un thread dédié (QueueListener)
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
+logger = logging.getLogger(__name__)
+access_logger, access_log_listener = access_log.setup_access_logger()
+
+def engine_options(config):
+    """SQLAlchemy engine options built from the DB_* settings."""
+    if config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return {}
+    options = {
+        'poolclass': dbpool.InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if config['SQLALCHEMY_DATABASE_URI'].startswith('postgres'):
+        connect_args = {'connect_timeout': config['DB_CONNECT_TIMEOUT']}
+        if config['DB_STATEMENT_TIMEOUT_MS']:
+            # Une requête qui dépasse est annulée par le serveur au lieu de bloquer le worker
+            connect_args['options'] = f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"
+        options['connect_args'] = connect_args
+    return options
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
 
 # Initialize extensions
 db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+
+def include_migration_name(name, type_, parent_names):
+    # Tables de l'index plein texte (search.py, FTS5) : hors modèles, ignorées par l'autogénération
+    return not (type_ == 'table' and name.startswith('search_'))
+
+migrate = Migrate(app, db, include_name=include_migration_name)
 jwt = JWTManager(app)
+response_cache = cache.make_cache(app.config)
+login_ip_limiter = ratelimit.make_limiter(
+    app.config['LOGIN_RATE_LIMIT'], app.config['LOGIN_IP_PER_MINUTE'], app.config['LOGIN_IP_BURST'],
+    app.config['LOGIN_RATE_LIMIT_URL'], prefix='portfolio:login:ip:')
+login_user_limiter = ratelimit.make_limiter(
+    app.config['LOGIN_RATE_LIMIT'], app.config['LOGIN_USER_PER_MINUTE'], app.config['LOGIN_USER_BURST'],
+    app.config['LOGIN_RATE_LIMIT_URL'], prefix='portfolio:login:user:')
+contact_ip_limiter = ratelimit.make_sliding_window(
+    app.config['CONTACT_RATE_LIMIT'], app.config['CONTACT_IP_LIMIT'], app.config['CONTACT_IP_WINDOW'],
+    app.config['CONTACT_RATE_LIMIT_URL'], prefix='portfolio:contact:ip:')
+contact_email_limiter = ratelimit.make_sliding_window(
+    app.config['CONTACT_RATE_LIMIT'], app.config['CONTACT_EMAIL_LIMIT'], app.config['CONTACT_EMAIL_WINDOW'],
+    app.config['CONTACT_RATE_LIMIT_URL'], prefix='portfolio:contact:email:')
+# Empreintes des messages récents (détection des doublons), même backend que les limiteurs
+contact_fingerprints = cache.build_cache(
+    app.config['CONTACT_RATE_LIMIT'], app.config['CONTACT_DUPLICATE_WINDOW'], max_entries=10000,
+    url=app.config['CONTACT_RATE_LIMIT_URL'], prefix='portfolio:contact:seen:')
+snapshot_store = snapshots.SnapshotStore(app.config['SNAPSHOT_FOLDER'])
+
+if app.config['TRUSTED_PROXIES']:
+    # Sans cela, derrière un proxy, tous les visiteurs partagent l'adresse du proxy
+    # et donc les quotas par IP de /api/login et /api/contact
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'],
+                            x_proto=app.config['TRUSTED_PROXIES'])
 
 CORS(app, resources={
     r"/api/*": {
@@ -53,7 +236,9 @@ CORS(app, resources={
 # Models
 project_tags = db.Table('project_tags',
     db.Column('project_id', db.Integer, db.ForeignKey('projects.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    # Sens inverse de la clé primaire : projets d'un tag (filtre ?tag=)
+    db.Index('ix_project_tags_tag_id_project_id', 'tag_id', 'project_id')
 )
 
 class User(db.Model):
@@ -61,24 +246,39 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    # 255 : les hachages scrypt ou pbkdf2:sha512 dépassent 128 caractères
+    password_hash = db.Column(db.String(255), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
+    # Incrémenté pour révoquer tous les jetons déjà émis
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(
+            password, method=app.config['PASSWORD_HASH_METHOD'], salt_length=app.config['PASSWORD_SALT_LENGTH'])
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    def needs_rehash(self):
+        """True if the stored hash was made with other parameters than PASSWORD_HASH_METHOD."""
+        return self.password_hash.split('$', 1)[0] != password_hash_prefix(app.config['PASSWORD_HASH_METHOD'])
+
+@lru_cache(maxsize=4)
+def password_hash_prefix(method):
+    # Méthode complétée par Werkzeug ("pbkdf2" -> "pbkdf2:sha256:600000") : un hachage par processus
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
 class Project(db.Model):
     __tablename__ = 'projects'
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    image = db.Column(db.Text)  # Changé de String(255) à Text
+    image = db.Column(db.Text)  # URL externe uniquement, les uploads vont dans image_hash
+    image_hash = db.Column(db.String(64))  # SHA-256 du fichier dans UPLOAD_FOLDER
+    image_mimetype = db.Column(db.String(50))  # Format du fichier, sans relire le blob à la sérialisation
     demo_url = db.Column(db.String(255))
     repo_url = db.Column(db.String(255))
-    featured = db.Column(db.Boolean, default=False)
+    featured = db.Column(db.Boolean, default=False, index=True)
     tags = db.relationship('Tag', secondary=project_tags, lazy='subquery',
                           backref=db.backref('projects', lazy=True))
 
@@ -92,7 +292,31 @@ class Skill(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     level = db.Column(db.Integer, nullable=False)
-    category = db.Column(db.String(20), nullable=False)
+    category = db.Column(db.String(20), nullable=False, index=True)
+
+class OutboxEmail(db.Model):
+    __tablename__ = 'outbox_emails'
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='pending')  # pending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    # Prochains messages à envoyer (deliver_outbox)
+    __table_args__ = (
+        db.Index('ix_outbox_emails_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+class ContentVersion(db.Model):
+    __tablename__ = 'content_versions'
+    name = db.Column(db.String(20), primary_key=True)  # 'projects', 'tags', 'skills'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
 
 class Contact(db.Model):
     __tablename__ = 'contacts'
@@ -102,10 +326,25 @@ class Contact(db.Model):
     subject = db.Column(db.String(200), nullable=False)
     message = db.Column(db.Text, nullable=False)
     read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), index=True)
+
+# Index partiel des messages non lus (compteur de l'admin) ; la requête doit
+# utiliser exactement la même condition, Contact.read.is_(False)
+db.Index('ix_contacts_unread', Contact.id,
+         postgresql_where=Contact.read.is_(False), sqlite_where=Contact.read.is_(False))
 
 # Helper functions
-def send_email(to, subject, template):
+def smtp_connection():
+    return mailer.SMTPConnection(
+        app.config['MAIL_SERVER'],
+        app.config['MAIL_PORT'],
+        use_tls=app.config['MAIL_USE_TLS'],
+        username=app.config['MAIL_USERNAME'],
+        password=app.config['MAIL_PASSWORD']
+    )
+
+def send_email(to, subject, template, connection):
+    """Send one email over an open SMTPConnection (raises on failure)."""
     msg = MIMEMultipart()
     msg['Subject'] = subject
     msg['From'] = app.config['MAIL_DEFAULT_SENDER']
@@ -113,27 +352,1123 @@ def send_email(to, subject, template):
     
     msg.attach(MIMEText(template, 'html'))
     
+    started = time.perf_counter()
     try:
-        server = smtplib.SMTP(app.config['MAIL_SERVER'], app.config['MAIL_PORT'])
-        if app.config['MAIL_USE_TLS']:
-            server.starttls()
-        if app.config['MAIL_USERNAME'] and app.config['MAIL_PASSWORD']:
-            server.login(app.config['MAIL_USERNAME'], app.config['MAIL_PASSWORD'])
-        server.send_message(msg)
-        server.quit()
-        return True
-    except Exception as e:
-        print(f"Error sending email: {e}")
+        connection.send(msg)
+    except Exception:
+        metrics.observe_smtp(time.perf_counter() - started, ok=False)
+        raise
+    metrics.observe_smtp(time.perf_counter() - started, ok=True)
+
+def queue_email(to, subject, template, session=None):
+    """Add an email to the outbox; it is sent once the current transaction commits."""
+    (session or db.session).add(OutboxEmail(recipient=to, subject=subject, body=template))
+
+def schedule_retry(email, error):
+    """Record a failed attempt: retry later with backoff, or give up after MAIL_MAX_ATTEMPTS."""
+    logger.warning('Error sending email %s (attempt %s): %s', email.id, email.attempts, error)
+    email.last_error = str(error)[:500]
+    if email.attempts >= app.config['MAIL_MAX_ATTEMPTS']:
+        email.status = 'failed'
+    else:
+        # Backoff exponentiel, plafonné à une heure
+        delay = min(app.config['MAIL_RETRY_DELAY'] * 2 ** (email.attempts - 1), 3600)
+        email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+def deliver_outbox():
+    """Send due outbox emails over a single SMTP connection; return how many were sent."""
+    due = (OutboxEmail.status == 'pending', OutboxEmail.next_attempt_at <= datetime.utcnow())
+    # File vide : pas de connexion SMTP à chaque réveil du worker
+    if not db.session.query(OutboxEmail.query.filter(*due).exists()).scalar():
+        db.session.rollback()
+        return 0
+    
+    with smtp_connection() as connection:
+        # Connexion ouverte avant de verrouiller les lignes : un serveur injoignable
+        # ne garde pas la transaction ouverte pendant le timeout
+        try:
+            connection.open()
+        except mailer.ConnectionFailed as e:
+            db.session.rollback()
+            logger.warning('Cannot connect to the SMTP server: %s', e)
+            return 0
+        
+        # SKIP LOCKED (PostgreSQL) : plusieurs workers peuvent vider la file sans doublons
+        emails = (OutboxEmail.query
+                  .filter(*due)
+                  .order_by(OutboxEmail.id)
+                  .limit(app.config['MAIL_BATCH_SIZE'])
+                  .with_for_update(skip_locked=True)
+                  .all())
+        sent = 0
+        for index, email in enumerate(emails):
+            email.attempts += 1
+            try:
+                send_email(email.recipient, email.subject, email.body, connection)
+            except mailer.ConnectionFailed as e:
+                schedule_retry(email, e)
+                # Serveur perdu : la suite du lot est reportée, sans compter de tentative
+                retry_at = datetime.utcnow() + timedelta(seconds=app.config['MAIL_RETRY_DELAY'])
+                for remaining in emails[index + 1:]:
+                    remaining.next_attempt_at = retry_at
+                break
+            except Exception as e:
+                schedule_retry(email, e)
+            else:
+                email.status = 'sent'
+                email.sent_at = datetime.utcnow()
+                sent += 1
+        db.session.commit()
+    return sent
+
+_outbox_wakeup = threading.Event()
+_outbox_thread = None
+
+def outbox_worker_loop():
+    while True:
+        with app.app_context():
+            try:
+                # On enchaîne les lots tant qu'il reste des emails à envoyer
+                while deliver_outbox() == app.config['MAIL_BATCH_SIZE']:
+                    pass
+            except Exception:
+                logger.exception('Error delivering the email outbox')
+        _outbox_wakeup.wait(app.config['MAIL_POLL_INTERVAL'])
+        _outbox_wakeup.clear()
+
+def wake_outbox_worker():
+    """Start the background sender of this worker if needed and wake it up."""
+    global _outbox_thread
+    if app.config['MAIL_QUEUE_WORKER'] != 'thread' or not app.config['MAIL_SERVER']:
+        return
+    # Démarré à la demande, donc après le fork des workers gunicorn
+    if _outbox_thread is None or not _outbox_thread.is_alive():
+        _outbox_thread = threading.Thread(target=outbox_worker_loop, name='outbox-sender', daemon=True)
+        _outbox_thread.start()
+    _outbox_wakeup.set()
+
+@app.before_request
+def start_outbox_worker():
+    # Reprend les emails en attente (retries, redémarrage) dès la première requête du worker
+    if _outbox_thread is None:
+        wake_outbox_worker()
+
+def after_fork():
+    """Reset per-process state in a freshly forked worker (gunicorn post_fork with preload_app)."""
+    with app.app_context():
+        # Les connexions ouvertes par le master restent à lui : on les oublie sans les fermer
+        db.engine.dispose(close=False)
+    dbpool.stats.reset()
+    # Le thread du journal d'accès démarré dans le master n'existe pas dans le fils
+    access_log_listener.start()
+
+IMAGE_URL_RE = re.compile(r'/api/images/(?P<digest>[0-9a-f]{64})(?:\?.*)?$')
+
+def image_url(image, image_hash):
+    if image_hash:
+        return url_for('get_image', image_hash=image_hash, _external=True)
+    return image
+
+def resolve_image(value):
+    """Return (image, image_hash, image_mimetype) for an incoming image field.
+
+    Data URIs are decoded once and written to the blob store; URLs pointing
+    back at /api/images/<hash> keep their hash; anything else is treated as
+    an external URL.
+    """
+    value = value.strip() if value else ''
+    if not value:
+        return None, None, None
+
+    upload_folder = app.config['UPLOAD_FOLDER']
+    if storage.is_data_uri(value):
+        data = storage.decode_data_uri(value)
+        return None, storage.save_blob(upload_folder, data), storage.sniff_mimetype(data[:storage.SNIFF_SIZE])
+
+    match = IMAGE_URL_RE.search(value)
+    if match and storage.blob_exists(upload_folder, match.group('digest')):
+        digest = match.group('digest')
+        return None, digest, storage.blob_mimetype(upload_folder, digest)
+
+    return value, None, None
+
+# Marge pour les en-têtes multipart autour du fichier
+MULTIPART_OVERHEAD = 16 * 1024
+
+def receive_image_upload():
+    """Stream the multipart `image` file of the request into the blob store; return (digest, mimetype).
+
+    The body is never held in memory: the file goes to a temporary file chunk
+    by chunk. A Content-Length above MAX_IMAGE_SIZE is refused before anything
+    is read (RequestEntityTooLarge), a longer stream stops as soon as it
+    exceeds it (storage.ImageTooLarge). Raises ValueError for a missing or
+    invalid file.
+    """
+    if request.mimetype != 'multipart/form-data':
+        raise storage.InvalidImage('Expected a multipart/form-data body with an image file')
+    
+    max_size = app.config['MAX_IMAGE_SIZE']
+    upload = storage.BlobUpload(app.config['UPLOAD_FOLDER'], max_size)
+    try:
+        # Pas de MAX_CONTENT_LENGTH global : l'import NDJSON accepte des corps bien plus gros.
+        # Pas de max_form_memory_size : Werkzeug l'applique aussi au tampon des parties
+        # fichier, ce qui refuserait toute image de plus de quelques dizaines de Ko ;
+        # max_content_length et BlobUpload.write bornent déjà la taille.
+        _, _, files = parse_form_data(request.environ, stream_factory=upload.stream_factory,
+                                      max_content_length=max_size + MULTIPART_OVERHEAD,
+                                      max_form_memory_size=None, max_form_parts=4, silent=False)
+        if 'image' not in files:
+            raise storage.InvalidImage('Missing image file')
+        return upload.save(), upload.mimetype
+    finally:
+        upload.discard()
+
+_variant_executor = None
+
+def schedule_image_variants(image_hash):
+    """Generate the resized variants of an image in the background worker pool."""
+    global _variant_executor
+    if not image_hash or storage.Image is None:
+        return
+    # Créé à la première utilisation pour ne pas hériter des threads à travers un fork gunicorn
+    if _variant_executor is None:
+        _variant_executor = ThreadPoolExecutor(max_workers=app.config['IMAGE_WORKERS'],
+                                               thread_name_prefix='image-variants')
+    _variant_executor.submit(storage.generate_variants, app.config['UPLOAD_FOLDER'],
+                             image_hash, app.config['IMAGE_VARIANT_WIDTHS'])
+
+def image_srcset(image_hash, image_mimetype):
+    """Map each variant format to a srcset string, e.g. {'webp': '<url> 320w, ...'}."""
+    # Pas de variantes pour un SVG/GIF (ou sans Pillow) : les URLs renverraient vers l'original
+    if not image_hash or not storage.resizable(image_mimetype):
+        return None
+    return {
+        ext: ', '.join(
+            f"{url_for('get_image_variant', image_hash=image_hash, width=width, ext=ext, _external=True)} {width}w"
+            for width in app.config['IMAGE_VARIANT_WIDTHS']
+        )
+        for ext in storage.VARIANT_FORMATS
+    }
+
+def validate_tag_names(names):
+    """Return an error message if `names` is not a valid list of tag names."""
+    if not isinstance(names, list):
+        return 'Tags must be an array'
+    for name in names:
+        if not isinstance(name, str):
+            return 'Tag names must be strings'
+        if len(name.strip()) > 50:
+            return 'Tag names must be at most 50 characters'
+    return None
+
+def resolve_tags(names):
+    """Return the Tag objects for `names`, creating the missing ones in bulk.
+
+    One IN query for the existing tags, then a single INSERT ... ON CONFLICT
+    DO NOTHING for the new names, so concurrent creations of the same tag
+    don't fail.
+    """
+    names = list(dict.fromkeys(name.strip() for name in names if name.strip()))  # Ignorer les tags vides
+    if not names:
+        return []
+    
+    tags = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names))}
+    missing = [name for name in names if name not in tags]
+    if missing:
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            stmt = postgresql.insert(Tag).on_conflict_do_nothing(index_elements=['name'])
+        elif dialect == 'sqlite':
+            stmt = sqlite.insert(Tag).on_conflict_do_nothing(index_elements=['name'])
+        else:
+            stmt = db.insert(Tag)
+        db.session.execute(stmt, [{'name': name} for name in missing])
+        tags.update((tag.name, tag) for tag in Tag.query.filter(Tag.name.in_(missing)))
+    
+    return [tags[name] for name in names]
+
+def inline_image(image, image_hash):
+    """Stored images as a data URI (export to another environment), other images as their URL."""
+    upload_folder = app.config['UPLOAD_FOLDER']
+    if image_hash and storage.blob_exists(upload_folder, image_hash):
+        return storage.blob_data_uri(upload_folder, image_hash)
+    return image_url(image, image_hash)
+
+EXCERPT_LENGTH = 160
+# Séparateur des noms de tags agrégés (caractère de contrôle, jamais saisi dans un nom)
+TAG_SEPARATOR = '\x1f'
+
+def split_tags(names):
+    return names.split(TAG_SEPARATOR) if names else []
+
+# Tags d'un projet agrégés en une colonne : une seule requête, même en streaming
+project_tag_names = (
+    db.select(db.func.aggregate_strings(Tag.name, TAG_SEPARATOR))
+    .join(project_tags, project_tags.c.tag_id == Tag.id)
+    .where(project_tags.c.project_id == Project.id)
+    .correlate(Project)
+    .scalar_subquery()
+    .label('tags')
+)
+
+# Champs exposés par l'API pour un projet, et expressions SQL lues par chacun
+PROJECT_SCHEMA = serializers.Schema(
+    id=serializers.Field(Project.id),
+    title=serializers.Field(Project.title),
+    description=serializers.Field(Project.description),
+    excerpt=serializers.Field(db.func.substr(Project.description, 1, EXCERPT_LENGTH).label('excerpt')),
+    image=serializers.Field(Project.image, Project.image_hash, convert=image_url),
+    srcset=serializers.Field(Project.image_hash, Project.image_mimetype, convert=image_srcset),
+    demoUrl=serializers.Field(Project.demo_url),
+    repoUrl=serializers.Field(Project.repo_url),
+    featured=serializers.Field(Project.featured),
+    tags=serializers.Field(project_tag_names, convert=split_tags),
+)
+PROJECT_DETAIL_FIELDS = ['id', 'title', 'description', 'image', 'srcset', 'demoUrl', 'repoUrl', 'featured', 'tags']
+PROJECT_SUMMARY_FIELDS = ['id', 'title', 'excerpt', 'image', 'srcset', 'demoUrl', 'repoUrl', 'featured', 'tags']
+PROJECT_DETAIL = PROJECT_SCHEMA.compile(PROJECT_DETAIL_FIELDS)
+PROJECT_SUMMARY = PROJECT_SCHEMA.compile(PROJECT_SUMMARY_FIELDS)
+
+# Lignes de /api/bulk/projects, relues telles quelles par l'import
+PROJECT_EXPORT_SCHEMA = serializers.Schema(
+    title=PROJECT_SCHEMA.fields['title'],
+    description=PROJECT_SCHEMA.fields['description'],
+    image=PROJECT_SCHEMA.fields['image'],
+    inlineImage=serializers.Field(Project.image, Project.image_hash, convert=inline_image, key='image'),
+    demoUrl=PROJECT_SCHEMA.fields['demoUrl'],
+    repoUrl=PROJECT_SCHEMA.fields['repoUrl'],
+    featured=PROJECT_SCHEMA.fields['featured'],
+    tags=PROJECT_SCHEMA.fields['tags'],
+)
+PROJECT_EXPORT = PROJECT_EXPORT_SCHEMA.compile(['title', 'description', 'image', 'demoUrl', 'repoUrl', 'featured', 'tags'])
+PROJECT_EXPORT_INLINE = PROJECT_EXPORT_SCHEMA.compile(['title', 'description', 'inlineImage', 'demoUrl', 'repoUrl', 'featured', 'tags'])
+
+def project_list_fields():
+    """Resolve ?fields= / ?view= into a list of field names (None if invalid)."""
+    if request.args.get('fields'):
+        fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+        if any(field not in PROJECT_SCHEMA for field in fields):
+            return None
+        return ['id'] + [field for field in fields if field != 'id']
+    if request.args.get('view', 'full') == 'summary':
+        return PROJECT_SUMMARY_FIELDS
+    return PROJECT_DETAIL_FIELDS
+
+def project_list_select():
+    """(serializer, select) for GET /api/projects from the query args; (None, None) if ?fields= is invalid."""
+    fields = project_list_fields()
+    if fields is None:
+        return None, None
+    
+    # Seules les colonnes des champs demandés sont sélectionnées (pas de description en vue résumé)
+    serializer = PROJECT_SCHEMA.compile(fields)
+    query = serializer.select()
+    
+    if request.args.get('featured', '').lower() == 'true':
+        query = query.where(Project.featured.is_(True))
+    
+    tag = request.args.get('tag')
+    if tag:
+        # IN sur l'index (tag_id, project_id) plutôt qu'un EXISTS évalué pour chaque projet
+        query = query.where(Project.id.in_(
+            db.select(project_tags.c.project_id)
+            .join(Tag, Tag.id == project_tags.c.tag_id)
+            .where(Tag.name == tag)
+        ))
+    return serializer, query
+
+TAG_LIST = serializers.Schema(
+    id=serializers.Field(Tag.id),
+    name=serializers.Field(Tag.name),
+).compile()
+
+SKILL_SCHEMA = serializers.Schema(
+    id=serializers.Field(Skill.id),
+    name=serializers.Field(Skill.name),
+    level=serializers.Field(Skill.level),
+    category=serializers.Field(Skill.category),
+)
+SKILL_DETAIL = SKILL_SCHEMA.compile()
+SKILL_EXPORT = SKILL_SCHEMA.compile(['name', 'level', 'category'])
+
+def skill_list_select():
+    """Select of GET /api/skills, filtered by ?category=."""
+    query = SKILL_DETAIL.select()
+    category = request.args.get('category')
+    if category and category != 'all':
+        query = query.where(Skill.category == category)
+    return query
+
+CONTACT_ADMIN = serializers.Schema(
+    id=serializers.Field(Contact.id),
+    name=serializers.Field(Contact.name),
+    email=serializers.Field(Contact.email),
+    subject=serializers.Field(Contact.subject),
+    message=serializers.Field(Contact.message),
+    read=serializers.Field(Contact.read),
+    created_at=serializers.Field(Contact.created_at, convert=datetime.isoformat),
+).compile()
+
+def serialize_one(serializer, key, value):
+    """Dict of the row where `key` == `value`, read with one SELECT (None if missing)."""
+    row = db.session.execute(serializer.select().where(key == value)).first()
+    return serializer.to_dict(row) if row is not None else None
+
+def bump_content_version(*tables):
+    """Increment the content version of `tables` in the current transaction.
+
+    Call before the commit of every mutation of public content: ETags and
+    response cache keys are derived from these versions.
+    """
+    now = datetime.utcnow().replace(microsecond=0)  # les dates HTTP sont à la seconde
+    updated = db.session.execute(
+        db.update(ContentVersion)
+        .where(ContentVersion.name.in_(tables))
+        .values(version=ContentVersion.version + 1, updated_at=now)
+    ).rowcount
+    if updated < len(tables):
+        existing = {name for (name,) in db.session.query(ContentVersion.name).filter(ContentVersion.name.in_(tables))}
+        for name in tables:
+            if name not in existing:
+                db.session.add(ContentVersion(name=name, version=1, updated_at=now))
+
+def content_state_select(tables):
+    return db.select(ContentVersion.name, ContentVersion.version, ContentVersion.updated_at).where(
+        ContentVersion.name.in_(tables))
+
+def content_state(tables, rows=None):
+    """Return ([versions], last_modified) for `tables` in a single query.
+
+    `rows` are the results of content_state_select(tables) when the caller
+    ran it itself (async mode).
+    """
+    if rows is None:
+        rows = db.session.execute(content_state_select(tables))
+    rows = {row.name: row for row in rows}
+    versions = [rows[name].version if name in rows else 0 for name in tables]
+    dates = [rows[name].updated_at for name in tables if name in rows]
+    return versions, max(dates) if dates else None
+
+def request_key():
+    """Path + the query args read by the view (see cached_response), sorted.
+
+    Other arguments do not change the response, so they must not create
+    new cache entries either (/api/projects?x=1, ?x=2...).
+    """
+    names = getattr(app.view_functions.get(request.endpoint), 'query_args', ())
+    return request.path + '?' + urlencode(sorted((name, request.args[name]) for name in names if name in request.args))
+
+def response_etag(versions):
+    # L'hôte fait partie de la clé : les URLs d'images sont absolues
+    raw_key = '|'.join([request.host, request_key(), repr(versions)])
+    return hashlib.sha1(raw_key.encode()).hexdigest()
+
+def is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        # Les variantes pré-compressées portent un suffixe d'encodage
+        return any(request.if_none_match.contains(tag) for tag in (etag, f'{etag}-gzip', f'{etag}-br'))
+    return (last_modified is not None and request.if_modified_since is not None
+            and request.if_modified_since.replace(tzinfo=None) >= last_modified)
+
+def set_public_cache_headers(response, etag, last_modified):
+    # Le client peut garder la réponse mais doit la revalider (304 quasi gratuit)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified_response(etag, last_modified):
+    """304 of a dynamic JSON route, with the ETag and Vary that compress_response gives its 200."""
+    response = app.response_class(status=304)
+    response.vary.add('Accept-Encoding')
+    encoding = compression.best_encoding(request.accept_encodings) if app.config['COMPRESS_RESPONSES'] else None
+    return set_public_cache_headers(response, f'{etag}-{encoding}' if encoding else etag, last_modified)
+
+def snapshot_response(entry, encoding, file):
+    last_modified = datetime.fromisoformat(entry['last_modified']) if entry['last_modified'] else None
+    if is_not_modified(entry['etag'], last_modified):
+        file.close()
+        response = app.response_class(status=304)
+    else:
+        # Fichier envoyé par morceaux (ou sendfile), jamais lu en entier en mémoire
+        response = app.response_class(wrap_file(request.environ, file), mimetype='application/json',
+                                      direct_passthrough=True)
+        response.content_length = os.fstat(file.fileno()).st_size
+        if encoding:
+            response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    etag = f"{entry['etag']}-{encoding}" if encoding else entry['etag']
+    return set_public_cache_headers(response, etag, last_modified)
+
+def cache_when_complete(chunks, cache, key):
+    """Yield `chunks`, then store the whole body in `cache` if it was small enough.
+
+    Buffering stops as soon as the body exceeds RESPONSE_CACHE_MAX_ENTRY_SIZE,
+    and nothing is stored if the client disconnects before the end.
+    """
+    limit = app.config['RESPONSE_CACHE_MAX_ENTRY_SIZE']
+    body = bytearray()
+    for chunk in chunks:
+        if body is not None:
+            body += chunk
+            if len(body) > limit:
+                body = None
+        yield chunk
+    if body is not None:
+        cache.set(key, bytes(body))
+
+def cache_response_body(response, cache, key):
+    """Store the body of `response` in `cache`; streamed bodies are stored once sent."""
+    if not response.is_streamed:
+        data = response.get_data()
+        if len(data) <= app.config['RESPONSE_CACHE_MAX_ENTRY_SIZE']:
+            cache.set(key, data)
+        return
+    chunks = response.response
+    response.response = cache_when_complete(response.iter_encoded(), cache, key)
+    if hasattr(chunks, 'close'):
+        response.call_on_close(chunks.close)
+
+def cached_response(*tables, args=()):
+    """Conditional + cached public GET, keyed by path, query `args` and the versions of `tables`.
+
+    Pre-rendered snapshots are served first, without touching the database.
+    Otherwise If-None-Match / If-Modified-Since are answered with a 304
+    before the view runs, and the serialized body comes from the response
+    cache when possible.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if app.config['SNAPSHOTS']:
+                snapshot = snapshot_store.lookup(request_key(), request.host_url, request.accept_encodings)
+                metrics.observe_cache('snapshot', snapshot is not None)
+                if snapshot is not None:
+                    return snapshot_response(*snapshot)
+            
+            versions, last_modified = content_state(tables)
+            etag = response_etag(versions)
+            
+            not_modified = is_not_modified(etag, last_modified)
+            metrics.observe_cache('conditional', not_modified)
+            if not_modified:
+                return not_modified_response(etag, last_modified)
+            
+            key = f'{view.__name__}:{etag}'
+            body = response_cache.get(key) if response_cache is not None else None
+            if response_cache is not None:
+                metrics.observe_cache('response', body is not None)
+            if body is not None:
+                response = app.response_class(body, mimetype='application/json')
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if response_cache is not None:
+                    cache_response_body(response, response_cache, key)
+            
+            return set_public_cache_headers(response, etag, last_modified)
+        wrapper.content_tables = tables
+        wrapper.query_args = args
+        return wrapper
+    return decorator
+
+SNAPSHOT_CATEGORY_RE = re.compile(r'^[\w-]+$')
+
+def snapshot_urls():
+    """Public GET URLs pre-rendered as snapshots, by file name."""
+    urls = {
+        'projects': '/api/projects',
+        'projects-summary': '/api/projects?view=summary',
+        'projects-featured': '/api/projects?featured=true',
+        'projects-featured-summary': '/api/projects?featured=true&view=summary',
+        'tags': '/api/tags',
+        'skills': '/api/skills',
+    }
+    for (category,) in db.session.query(Skill.category).distinct():
+        if SNAPSHOT_CATEGORY_RE.match(category):
+            urls[f'skills-{category}'] = f'/api/skills?category={category}'
+    return urls
+
+def refresh_snapshots(base_url=None):
+    """Regenerate every snapshot from the current data; call after a commit.
+
+    If they cannot be regenerated, the manifest is removed so that the
+    dynamic routes serve the new data instead of stale snapshots.
+    """
+    if not app.config['SNAPSHOTS']:
+        return
+    if base_url is None:
+        base_url = app.config['SNAPSHOT_BASE_URL'] or (request.host_url if has_request_context() else None)
+    if not base_url:
+        snapshots.invalidate(app.config['SNAPSHOT_FOLDER'])
+        return
+    
+    try:
+        entries = {}
+        states = {}
+        # Contexte d'application séparé : session et compteurs SQL distincts de la requête admin
+        with app.app_context():
+            for name, url in snapshot_urls().items():
+                # Même code que la route dynamique, donc mêmes octets et même ETag
+                with app.test_request_context(url, base_url=base_url):
+                    view = app.view_functions[request.endpoint]
+                    if view.content_tables not in states:
+                        states[view.content_tables] = content_state(view.content_tables)
+                    versions, last_modified = states[view.content_tables]
+                    response = make_response(view.__wrapped__())
+                    entries[request_key()] = {
+                        'name': name,
+                        'etag': response_etag(versions),
+                        'last_modified': last_modified.isoformat() if last_modified else None,
+                        'body': response.get_data(),
+                    }
+        versions = {name: version for tables, (table_versions, _) in states.items()
+                    for name, version in zip(tables, table_versions)}
+        # Refusé si un rafraîchissement concurrent a déjà écrit des versions plus récentes
+        snapshots.write_snapshots(app.config['SNAPSHOT_FOLDER'], entries, base_url, versions)
+    except Exception:
+        # Les routes dynamiques restent disponibles, on ne fait pas échouer l'écriture
+        logger.exception('Error refreshing snapshots')
+        try:
+            snapshots.invalidate(app.config['SNAPSHOT_FOLDER'])
+        except OSError:
+            logger.exception('Error invalidating snapshots')
+
+# Pagination par clé (keyset) : pas d'OFFSET, le curseur contient la clé du dernier élément
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps([value]).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode an opaque cursor back into the last seen id (ValueError if invalid)."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != 1 or not isinstance(values[0], int):
+        raise ValueError('Invalid cursor')
+    return values[0]
+
+def pagination_args():
+    """Return the page size from ?limit=/?cursor=, or None for the unpaginated legacy response."""
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return None
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def keyset_select(query, key, limit, descending=False):
+    """The select `query` restricted to one page after ?cursor=, ordered by the unique integer column `key`."""
+    cursor = request.args.get('cursor')
+    query = query.order_by(key.desc() if descending else key.asc())
+
+    if cursor:
+        last_seen = decode_cursor(cursor)
+        query = query.filter(key < last_seen if descending else key > last_seen)
+
+    # Un élément de plus pour savoir s'il existe une page suivante
+    return query.limit(limit + 1)
+
+def keyset_split(rows, key, limit):
+    """Return (rows, next_cursor) from the rows fetched by keyset_select()."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(getattr(rows[-1], key.key))
+
+def keyset_page(query, key, limit, descending=False):
+    """Fetch one page of the select `query` ordered by the unique integer column `key`.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    rows = db.session.execute(keyset_select(query, key, limit, descending)).all()
+    return keyset_split(rows, key, limit)
+
+_token_versions = {}
+_token_versions_lock = threading.Lock()
+
+def current_token_version(user_id):
+    """Token version of a user, cached in memory for TOKEN_VERSION_TTL seconds."""
+    now = time.monotonic()
+    cached = _token_versions.get(user_id)
+    hit = cached is not None and cached[1] > now
+    metrics.observe_cache('token_version', hit)
+    if hit:
+        return cached[0]
+    
+    version = db.session.query(User.token_version).filter(User.id == int(user_id), User.is_admin.is_(True)).scalar()
+    with _token_versions_lock:
+        _token_versions[user_id] = (version, now + app.config['TOKEN_VERSION_TTL'])
+    return version
+
+def admin_required(view):
+    """Require a valid JWT carrying the is_admin claim and a current token version."""
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        claims = get_jwt()
+        if not claims.get('is_admin') or claims.get('token_version') != current_token_version(get_jwt_identity()):
+            return jsonify({'message': 'Unauthorized access'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def has_admin_token():
+    """True if the request carries a valid admin JWT; a missing or invalid token is not an error."""
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, PyJWTError):
+        # Jeton mal formé, expiré ou révoqué : la route publique répond comme à un anonyme
         return False
+    claims = get_jwt()
+    return bool(claims.get('is_admin')) and claims.get('token_version') == current_token_version(get_jwt_identity())
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+def query_budget(limit, allow_repeats=False):
+    """Declare the maximum number of SQL statements a view may run (None: no limit).
+
+    Checked after each request when QUERY_BUDGET is warn or raise. Put it
+    right under @app.route so the registered view carries the budget.
+    """
+    def decorator(view):
+        view.query_budget = limit
+        view.query_repeats_allowed = allow_repeats
+        return view
+    return decorator
+
+def query_budget_problems(view, statements):
+    """Return the budget violations of one request, as messages."""
+    problems = []
+    limit = getattr(view, 'query_budget', None)
+    if limit is not None and len(statements) > limit:
+        problems.append(f'{len(statements)} SQL statements, budget is {limit}')
+    if not getattr(view, 'query_repeats_allowed', False):
+        # Même SQL (paramètres à part) exécuté en boucle : chargement ligne à ligne
+        for statement, count in Counter(statements).items():
+            if count >= app.config['QUERY_REPEAT_THRESHOLD']:
+                problems.append(f"same statement run {count} times (N+1?): {' '.join(statement.split())[:200]}")
+    return problems
+
+# Recherche plein texte : l'index est écrit dans la transaction des routes d'écriture
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+def search_backend():
+    return search.backend_for(db.engine.dialect.name)
+
+def index_project(project):
+    """Write the project's search document in the current transaction."""
+    backend = search_backend()
+    if backend is None:
+        return
+    db.session.flush()  # id du nouveau projet
+    backend.upsert(db.session, 'projects', project.id, project.title,
+                   [tag.name for tag in project.tags], project.description)
+
+def index_contact(contact, session=None):
+    """Write the contact message's search document in the current transaction."""
+    session = session or db.session
+    backend = search.backend_for(session.get_bind().dialect.name)
+    if backend is None:
+        return
+    session.flush()
+    backend.upsert(session, 'contacts', contact.id, contact.subject,
+                   [contact.name, contact.email], contact.message)
+
+def unindex(kind, doc_id):
+    backend = search_backend()
+    if backend is not None:
+        backend.delete(db.session, kind, doc_id)
+
+def rate_limited(limiter, key, name, message):
+    """429 response if `limiter` has no attempt left for `key`, else None (also without limiter)."""
+    if limiter is None:
+        return None
+    allowed, retry_after = limiter.take(key)
+    if allowed:
+        return None
+    metrics.observe_rate_limited(name)
+    response = jsonify({'message': message})
+    response.status_code = 429
+    response.headers['Retry-After'] = ratelimit.retry_after_header(retry_after)
+    return response
+
+CONTACT_FIELDS = ['name', 'email', 'subject', 'message']
+# Longueurs des colonnes de Contact ; message : CONTACT_MAX_MESSAGE_LENGTH
+CONTACT_MAX_LENGTHS = {'name': 100, 'email': 120, 'subject': 200}
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+def contact_values(data):
+    """Validate a contact form submission; return (values, error message)."""
+    for field in CONTACT_FIELDS:
+        if not isinstance(data.get(field), str) or not data[field].strip():
+            return None, f'Missing or empty required field: {field}'
+        max_length = CONTACT_MAX_LENGTHS.get(field, app.config['CONTACT_MAX_MESSAGE_LENGTH'])
+        if len(data[field].strip()) > max_length:
+            return None, f'Field too long: {field} (max {max_length} characters)'
+    if not EMAIL_RE.match(data['email'].strip()):
+        return None, 'Invalid email format'
+    return {field: data[field].strip() for field in CONTACT_FIELDS}, None
+
+def contact_fingerprint(values):
+    # Casse et espaces ignorés : un robot qui varie la mise en forme est reconnu
+    return hashlib.sha256(' '.join(values['message'].lower().split()).encode()).hexdigest()
+
+def contact_accepted():
+    return jsonify({'message': 'Contact form submitted successfully'}), 201
+
+def contact_precheck():
+    """Body size cap and per-IP limit, before the JSON body is even parsed."""
+    max_size = app.config['CONTACT_MAX_BODY_SIZE']
+    if request.content_length is None and 'wsgi.input_terminated' in request.environ:
+        # Corps sans Content-Length (chunked) : lu ici, au plus un octet au-delà de la
+        # limite, puis remis en place avec sa taille pour get_json()
+        body = LimitedStream(request.environ['wsgi.input'], max_size + 1, is_max=True).read()
+        if len(body) > max_size:
+            return jsonify({'message': 'Request body too large'}), 413
+        request.environ['wsgi.input'] = io.BytesIO(body)
+        request.environ['CONTENT_LENGTH'] = str(len(body))
+    elif (request.content_length or 0) > max_size:
+        return jsonify({'message': 'Request body too large'}), 413
+    return rate_limited(contact_ip_limiter, request.remote_addr or '', 'contact',
+                        'Too many messages, try again later')
+
+def contact_spam_check(data, values):
+    """Honeypot, per-email limit and duplicate message; response to return, or None to save.
+
+    Spam gets the normal success response without being stored, so bots
+    have no signal to adapt to.
+    """
+    if data.get(app.config['CONTACT_HONEYPOT_FIELD']):
+        metrics.observe_contact_dropped('honeypot')
+        return contact_accepted()
+    limited = rate_limited(contact_email_limiter, values['email'].lower(), 'contact',
+                           'Too many messages, try again later')
+    if limited is not None:
+        return limited
+    if contact_fingerprints is not None and contact_fingerprints.get(contact_fingerprint(values)) is not None:
+        metrics.observe_contact_dropped('duplicate')
+        return contact_accepted()
+    return None
+
+def remember_contact(values):
+    # Après le commit : un envoi qui a échoué peut être renvoyé tel quel
+    if contact_fingerprints is not None:
+        contact_fingerprints.set(contact_fingerprint(values), b'1')
+
+def save_contact(session, values):
+    """Add a contact, its search document and the admin notification to the transaction of `session`.
+
+    Returns True if a notification was queued. `session` is db.session, or
+    the sync facade of an async session (AsyncSession.run_sync, asgi.py).
+    """
+    contact = Contact(**values)
+    session.add(contact)
+    index_contact(contact, session)
+    
+    # Notification de l'admin : mise en file dans la même transaction que le contact,
+    # l'envoi SMTP se fait en arrière-plan
+    admin_email = app.config.get('ADMIN_EMAIL')
+    if admin_email:
+        email_subject = f"New Contact Form Submission: {values['subject']}"
+        email_body = f"""
+        <h2>New Contact Form Submission</h2>
+        <p><strong>Name:</strong> {values['name']}</p>
+        <p><strong>Email:</strong> {values['email']}</p>
+        <p><strong>Subject:</strong> {values['subject']}</p>
+        <p><strong>Message:</strong></p>
+        <p>{values['message']}</p>
+        """
+        queue_email(admin_email, email_subject, email_body, session)
+    return bool(admin_email)
+
+def rebuild_search_index():
+    """Recreate the search tables from the projects and contacts; commits."""
+    backend = search_backend()
+    if backend is None:
+        return
+    backend.drop(db.session)
+    backend.create(db.session)
+    for project in Project.query.options(selectinload(Project.tags)).order_by(Project.id).yield_per(200):
+        index_project(project)
+    for contact in Contact.query.order_by(Contact.id).yield_per(200):
+        index_contact(contact)
+    db.session.commit()
+
+# Import / export en masse (NDJSON : un objet JSON par ligne)
+MAX_BULK_ERRORS = 100
+
+def read_ndjson(stream):
+    """Yield (line number, parsed value) for each non-empty line; None if it is not JSON."""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+def check_lengths(table, values):
+    """Raise ValueError if a string value is longer than its column allows."""
+    for name, value in values.items():
+        length = getattr(table.c[name].type, 'length', None)
+        if length and isinstance(value, str) and len(value) > length:
+            raise ValueError(f'{name} is too long (maximum {length} characters)')
+
+def required_string(record, field):
+    value = record.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f'Missing or empty required field: {field}')
+    return value.strip()
+
+def optional_string(record, field):
+    value = record.get(field)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f'{field} must be a string')
+    return value.strip() if value else None
+
+def validate_project_record(record):
+    """Turn one imported line into (column values, tag names); raises ValueError."""
+    tags = record.get('tags', [])
+    tags_error = validate_tag_names(tags)
+    if tags_error:
+        raise ValueError(tags_error)
+    values = {
+        'title': required_string(record, 'title'),
+        'description': required_string(record, 'description'),
+        'demo_url': optional_string(record, 'demoUrl'),
+        'repo_url': optional_string(record, 'repoUrl'),
+        'featured': bool(record.get('featured', False)),
+    }
+    check_lengths(Project.__table__, values)
+    # Dernière étape : l'image n'est écrite dans le stockage que pour une ligne valide
+    values['image'], values['image_hash'], values['image_mimetype'] = resolve_image(optional_string(record, 'image'))
+    return values, tags
+
+def insert_projects(batch):
+    """Insert a batch of validated projects with one executemany per table."""
+    rows = [values for values, _ in batch]
+    ids = db.session.execute(
+        db.insert(Project).returning(Project.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    
+    tags = {tag.name: tag for tag in resolve_tags([name for _, names in batch for name in names])}
+    links, documents = [], []
+    for project_id, (values, names) in zip(ids, batch):
+        names = list(dict.fromkeys(name.strip() for name in names if name.strip()))
+        links.extend({'project_id': project_id, 'tag_id': tags[name].id} for name in names)
+        documents.append((project_id, values['title'], names, values['description']))
+    if links:
+        db.session.execute(project_tags.insert(), links)
+    
+    backend = search_backend()
+    if backend is not None:
+        backend.upsert_many(db.session, 'projects', documents)
+    bump_content_version('projects', 'tags')
+    
+    for image_hash in {values['image_hash'] for values in rows if values['image_hash']}:
+        schedule_image_variants(image_hash)
+
+def validate_skill_record(record):
+    """Turn one imported line into Skill column values; raises ValueError."""
+    level = record.get('level')
+    if not isinstance(level, int) or isinstance(level, bool):
+        raise ValueError('level must be an integer')
+    values = {
+        'name': required_string(record, 'name'),
+        'level': level,
+        'category': required_string(record, 'category'),
+    }
+    check_lengths(Skill.__table__, values)
+    return values
+
+def insert_skills(batch):
+    db.session.execute(db.insert(Skill), batch)
+    bump_content_version('skills')
+
+def bulk_import(validate, insert):
+    """Read the NDJSON request body and insert valid lines in batched transactions.
+
+    Invalid lines are skipped and reported; each batch is committed on its
+    own, so a database error keeps the batches already committed.
+    """
+    batch_size = app.config['BULK_BATCH_SIZE']
+    created, errors, batch = 0, [], []
+    
+    def commit(batch):
+        try:
+            insert(batch)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    try:
+        for number, record in read_ndjson(request.stream):
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError('Each line must be a JSON object')
+                batch.append(validate(record))
+            except ValueError as e:
+                if len(errors) < MAX_BULK_ERRORS:
+                    errors.append({'line': number, 'message': str(e)})
+                continue
+            
+            if len(batch) >= batch_size:
+                commit(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            commit(batch)
+            created += len(batch)
+    except Exception as e:
+        logger.exception('Database error during bulk import')
+        return jsonify({'message': f'Database error: {str(e)}', 'created': created, 'errors': errors}), 500
+    finally:
+        if created:
+            refresh_snapshots()
+    
+    return jsonify({'created': created, 'errors': errors}), 200 if created or not errors else 400
+
+# Lignes lues par aller-retour (curseur côté serveur avec PostgreSQL)
+STREAM_BATCH_SIZE = 100
+
+def json_array_response(query, serialize):
+    """Stream the rows of a select as a JSON array, `STREAM_BATCH_SIZE` at a time.
+
+    The SELECT runs here, inside the view (so it counts towards the query
+    budget); rows are then fetched and serialized while the body is sent, and
+    neither the objects, the dicts nor the full JSON string are kept.
+    """
+    rows = db.session.execute(query, execution_options={'yield_per': STREAM_BATCH_SIZE})
+    return app.response_class(stream_with_context(jsonstream.array_chunks(rows, serialize)),
+                              mimetype='application/json')
+
+def ndjson_response(records):
+    """Stream an iterable of dicts as NDJSON, one line per record."""
+    def generate():
+        for record in records:
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+# Les tables d'index ne sont pas des modèles : create_all/drop_all les gèrent ici
+@event.listens_for(db.metadata, 'after_create')
+def create_search_tables(target, connection, **kw):
+    backend = search.backend_for(connection.dialect.name)
+    if backend is not None:
+        backend.create(connection)
+
+@event.listens_for(db.metadata, 'before_drop')
+def drop_search_tables(target, connection, **kw):
+    backend = search.backend_for(connection.dialect.name)
+    if backend is not None:
+        backend.drop(connection)
 
 # Routes
+@app.route('/api/images/<string(length=64):image_hash>', methods=['GET'])
+@query_budget(0)
+def get_image(image_hash):
+    upload_folder = app.config['UPLOAD_FOLDER']
+    if not storage.blob_exists(upload_folder, image_hash):
+        return jsonify({'message': 'Image not found'}), 404
+
+    # Le contenu ne change jamais pour un hash donné : cache immuable
+    mimetype = storage.blob_mimetype(upload_folder, image_hash)
+    response = send_file(
+        storage.blob_path(upload_folder, image_hash),
+        mimetype=mimetype,
+        etag=image_hash,
+        max_age=31536000,
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if mimetype == 'image/svg+xml':
+        # SVG d'avant le refus à l'envoi : affichable en <img>, mais jamais
+        # exécuté comme document sur notre origine (jeton admin dans localStorage)
+        response.headers['Content-Security-Policy'] = 'sandbox'
+        response.headers['Content-Disposition'] = 'attachment'
+    return response
+
+@app.route('/api/images', methods=['POST'])
+@query_budget(1)
+@admin_required
+def upload_image():
+    # Le hash (ou l'URL) renvoyé s'utilise ensuite comme champ image d'un projet
+    try:
+        image_hash, image_mimetype = receive_image_upload()
+    except storage.ImageTooLarge as e:
+        return jsonify({'message': str(e)}), 413
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    schedule_image_variants(image_hash)
+    return jsonify({
+        'hash': image_hash,
+        'url': url_for('get_image', image_hash=image_hash, _external=True),
+        'srcset': image_srcset(image_hash, image_mimetype)
+    }), 201
+
+@app.route('/api/images/<string(length=64):image_hash>/<int:width>.<any(webp, jpg):ext>', methods=['GET'])
+@query_budget(0)
+def get_image_variant(image_hash, width, ext):
+    upload_folder = app.config['UPLOAD_FOLDER']
+    if width not in app.config['IMAGE_VARIANT_WIDTHS'] or not storage.blob_exists(upload_folder, image_hash):
+        return jsonify({'message': 'Image not found'}), 404
+
+    # Sans Pillow (ou pour un SVG/GIF) on renvoie vers l'original
+    if not storage.variants_supported(upload_folder, image_hash):
+        return redirect(url_for('get_image', image_hash=image_hash))
+
+    # Normalement déjà générée par le pool ; sinon on la génère ici une seule fois
+    path = storage.generate_variant(upload_folder, image_hash, width, ext)
+    response = send_file(
+        path,
+        mimetype=storage.VARIANT_FORMATS[ext][1],
+        etag=f'{image_hash}-{width}-{ext}',
+        max_age=31536000,
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+def login_rate_limited(username):
+    """429 response if this IP or this username has no login attempt left, else None.
+
+    Checked before the user lookup and the password hash, so throttled
+    attempts cost neither a query nor a hash, and the answer does not
+    depend on whether the username exists.
+    """
+    for limiter, key in ((login_ip_limiter, request.remote_addr or ''), (login_user_limiter, username[:80])):
+        response = rate_limited(limiter, key, 'login', 'Too many login attempts, try again later')
+        if response is not None:
+            return response
+    return None
+
 @app.route('/api/login', methods=['POST'])
+# SELECT de l'utilisateur, plus l'UPDATE du hachage quand son coût a changé
+@query_budget(2)
 def login():
     data = request.get_json()
     
     if not data or not data.get('username') or not data.get('password'):
         return jsonify({'message': 'Missing username or password'}), 400
     
+    if not isinstance(data['username'], str) or not isinstance(data['password'], str):
+        return jsonify({'message': 'Username and password must be strings'}), 400
+    
+    limited = login_rate_limited(data['username'])
+    if limited is not None:
+        return limited
+    
     user = User.query.filter_by(username=data['username']).first()
     
     if not user or not user.check_password(data['password']):
@@ -142,66 +1477,57 @@ def login():
     if not user.is_admin:
         return jsonify({'message': 'Unauthorized access'}), 403
     
-    access_token = create_access_token(identity=str(user.id))
+    # Les droits sont embarqués dans le jeton : pas de lecture de User sur les routes admin
+    access_token = create_access_token(
+        identity=str(user.id),
+        additional_claims={'is_admin': True, 'token_version': user.token_version}
+    )
+    
+    if user.needs_rehash():
+        # Le mot de passe en clair n'est disponible qu'ici : re-hachage transparent,
+        # après la lecture des champs du jeton (le commit les expire)
+        user.set_password(data['password'])
+        db.session.commit()
     return jsonify({'access_token': access_token}), 200
 
 # Project routes
 @app.route('/api/projects', methods=['GET'])
+@query_budget(2)
+@cached_response('projects', 'tags', args=('fields', 'view', 'featured', 'tag', 'limit', 'cursor'))
 def get_projects():
-    featured = request.args.get('featured', '').lower() == 'true'
-    tag = request.args.get('tag')
-    
-    query = Project.query
-    
-    if featured:
-        query = query.filter_by(featured=True)
-    
-    if tag:
-        query = query.join(Project.tags).filter(Tag.name == tag)
+    serializer, query = project_list_select()
+    if serializer is None:
+        return jsonify({'message': f"Invalid fields. Allowed: {', '.join(PROJECT_SCHEMA.fields)}"}), 400
     
-    projects = query.all()
+    limit = pagination_args()
+    if limit is None:
+        return json_array_response(query, serializer.to_dict)
     
-    result = []
-    for project in projects:
-        result.append({
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'image': project.image,
-            'demoUrl': project.demo_url,
-            'repoUrl': project.repo_url,
-            'featured': project.featured,
-            'tags': [tag.name for tag in project.tags]
-        })
+    try:
+        rows, next_cursor = keyset_page(query, Project.id, limit)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    return jsonify(result)
+    return jsonify({
+        'items': [serializer.to_dict(row) for row in rows],
+        'next_cursor': next_cursor
+    })
 
 @app.route('/api/projects/<int:project_id>', methods=['GET'])
+@query_budget(2)
+@cached_response('projects', 'tags')
 def get_project(project_id):
-    project = Project.query.get_or_404(project_id)
+    project = serialize_one(PROJECT_DETAIL, Project.id, project_id)
+    if project is None:
+        return jsonify({'message': 'Project not found'}), 404
     
-    return jsonify({
-        'id': project.id,
-        'title': project.title,
-        'description': project.description,
-        'image': project.image,
-        'demoUrl': project.demo_url,
-        'repoUrl': project.repo_url,
-        'featured': project.featured,
-        'tags': [tag.name for tag in project.tags]
-    })
+    return jsonify(project)
 
 from werkzeug.exceptions import BadRequest
 @app.route('/api/projects', methods=['POST'])
-@jwt_required(optional=False)
+@query_budget(16)
+@admin_required
 def create_project():
-    current_user_id = get_jwt_identity()
-    # CORRECTION: Utiliser Session.get() au lieu de Query.get()
-    user = db.session.get(User, current_user_id)
-    
-    if not user or not user.is_admin:
-        return jsonify({'message': 'Unauthorized access'}), 403
-    
     # Vérification que les données JSON sont présentes
     try:
         data = request.get_json()
@@ -216,9 +1542,11 @@ def create_project():
         if field not in data or not data[field].strip():
             return jsonify({'message': f'Missing or empty required field: {field}'}), 400
     
-    # Validation des tags
-    if 'tags' in data and not isinstance(data['tags'], list):
-        return jsonify({'message': 'Tags must be an array'}), 400
+    # Validation des tags (avant toute écriture en base)
+    if 'tags' in data:
+        tags_error = validate_tag_names(data['tags'])
+        if tags_error:
+            return jsonify({'message': tags_error}), 400
     
     # VALIDATION: Vérifier la taille de l'image si elle est présente
     if 'image' in data and data['image']:
@@ -226,10 +1554,18 @@ def create_project():
         if len(data['image']) > 10 * 1024 * 1024:  # 10MB
             return jsonify({'message': 'Image too large. Maximum size is 10MB'}), 400
     
+    # Décodage unique de l'image et écriture dans le stockage par hash
+    try:
+        image, image_hash, image_mimetype = resolve_image(data.get('image'))
+    except storage.InvalidImage as e:
+        return jsonify({'message': str(e)}), 400
+    
     project = Project(
         title=data['title'].strip(),
         description=data['description'].strip(),
-        image=data.get('image', '').strip() if data.get('image') else None,
+        image=image,
+        image_hash=image_hash,
+        image_mimetype=image_mimetype,
         demo_url=data.get('demoUrl', '').strip() if data.get('demoUrl') else None,
         repo_url=data.get('repoUrl', '').strip() if data.get('repoUrl') else None,
         featured=bool(data.get('featured', False))
@@ -238,19 +1574,15 @@ def create_project():
     # CORRECTION: Ajouter le projet à la session avant de traiter les tags
     db.session.add(project)
     
-    # Traitement des tags
+    # Traitement des tags : résolus en une requête, association insérée en un seul lot
     if 'tags' in data:
-        for tag_name in data['tags']:
-            if not isinstance(tag_name, str):
-                return jsonify({'message': 'Tag names must be strings'}), 400
-            
-            tag_name = tag_name.strip()
-            if tag_name:  # Ignorer les tags vides
-                tag = Tag.query.filter_by(name=tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.session.add(tag)
-                project.tags.append(tag)
+        project.tags = resolve_tags(data['tags'])
+    
+    index_project(project)
+    project_id, image_hash = project.id, project.image_hash
+    
+    # Nouvelle version du contenu dans la même transaction (ETag, cache)
+    bump_content_version('projects', 'tags')
     
     try:
         db.session.commit()
@@ -267,16 +1599,10 @@ def create_project():
         else:
             return jsonify({'message': f'Database error: {error_message}'}), 500
     
-    return jsonify({
-        'id': project.id,
-        'title': project.title,
-        'description': project.description,
-        'image': project.image,
-        'demoUrl': project.demo_url,
-        'repoUrl': project.repo_url,
-        'featured': project.featured,
-        'tags': [tag.name for tag in project.tags]
-    }), 201
+    schedule_image_variants(image_hash)
+    refresh_snapshots()
+    
+    return jsonify(serialize_one(PROJECT_DETAIL, Project.id, project_id)), 201
     
 @app.errorhandler(422)
 def handle_unprocessable_entity(e):
@@ -291,31 +1617,146 @@ def handle_bad_request(e):
         'error': 'Bad Request',
         'message': 'The request could not be understood by the server due to malformed syntax.'
     }), 400
+
+@app.errorhandler(413)
+def handle_request_entity_too_large(e):
+    return jsonify({
+        'error': 'Request Entity Too Large',
+        'message': f"Image too large. Maximum size is {app.config['MAX_IMAGE_SIZE'] // (1024 * 1024)}MB"
+    }), 413
     
-# 5. Ajout de logs pour le débogage
-import logging
+# Journal d'accès : échantillonné, structuré, sans lecture du corps des requêtes
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
 
-# Configuration des logs
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
+@app.after_request
+def log_request(response):
+    # Les erreurs serveur sont toujours journalisées, le reste selon ACCESS_LOG_SAMPLE_RATE
+    if response.status_code < 500 and random.random() >= app.config['ACCESS_LOG_SAMPLE_RATE']:
+        return response
+    started = g.get('request_started')
+    access_logger.info('request', extra={'access': {
+        'method': request.method,
+        'path': request.path,
+        'args': access_log.redact(request.args),
+        'status': response.status_code,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2) if started else None,
+        'request_bytes': request.content_length,
+        'response_bytes': response.content_length,
+        'remote_addr': request.remote_addr,
+        'user_agent': (request.user_agent.string or '')[:access_log.MAX_VALUE_LENGTH],
+    }})
+    return response
 
-# Middleware pour logger les requêtes
-@app.before_request
-def log_request_info():
-    logger.debug('Request: %s %s', request.method, request.url)
-    if request.is_json:
-        logger.debug('JSON Data: %s', request.get_json())
+# Métriques : SQL compté par instruction, puis rattaché à la requête HTTP en cours
+dbpool.stats.observers.append(metrics.observe_pool_checkout)
 
-@app.route('/api/projects/<int:project_id>', methods=['PUT'])
-@jwt_required(optional=False)
-def update_project(project_id):
-    current_user_id = get_jwt_identity()
-    # CORRECTION: Utiliser Session.get() au lieu de Query.get()
-    user = db.session.get(User, current_user_id)
-    
-    if not user or not user.is_admin:
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info['query_started'].pop()
+    metrics.observe_query(duration)
+    if has_request_context():
+        g.db_queries = g.get('db_queries', 0) + 1
+        g.db_seconds = g.get('db_seconds', 0.0) + duration
+        if app.config['QUERY_BUDGET'] != 'off':
+            g.setdefault('db_statements', []).append(statement)
+
+@event.listens_for(Engine, 'handle_error')
+def discard_query_timer(context):
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    # request.endpoint (nom de la vue) plutôt que le chemin : nombre de séries borné
+    metrics.observe_request(
+        request.method, request.endpoint or 'unmatched', response.status_code,
+        time.perf_counter() - started, response.content_length,
+        g.get('db_queries', 0), g.get('db_seconds', 0.0)
+    )
+    pool = dbpool.stats.snapshot(db.engine.pool)
+    if 'capacity' in pool:
+        metrics.set_pool_usage(pool['checked_out'], pool['capacity'])
+    return response
+
+@app.after_request
+def check_query_budget(response):
+    if app.config['QUERY_BUDGET'] == 'off' or request.endpoint is None:
+        return response
+    statements = g.get('db_statements', [])
+    response.headers['X-Query-Count'] = str(len(statements))
+    problems = query_budget_problems(app.view_functions[request.endpoint], statements)
+    if problems:
+        message = f"Query budget of {request.endpoint} ({request.method} {request.full_path}): " + '; '.join(problems)
+        if app.config['QUERY_BUDGET'] == 'raise':
+            g.pop('db_statements')  # la réponse d'erreur 500 repasse par ce hook
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+    return response
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson'}
+
+# Enregistré après les autres hooks, donc exécuté avant eux : métriques et journal
+# d'accès voient la taille compressée
+@app.after_request
+def compress_response(response):
+    """gzip/brotli JSON responses per Accept-Encoding; streamed bodies are compressed on the fly."""
+    if (not app.config['COMPRESS_RESPONSES'] or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code in (204, 206, 304) or response.content_encoding
+            or response.direct_passthrough):
+        return response
+    # La représentation dépend de Accept-Encoding, même quand elle n'est pas compressée
+    response.vary.add('Accept-Encoding')
+    encoding = compression.best_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    # Même convention que les snapshots : ETag suffixé par l'encodage négocié, même pour un
+    # corps trop petit pour être compressé, comme le 304 qui ne connaît pas le corps
+    # (not_modified_response)
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+    
+    if response.is_streamed:
+        chunks = response.response
+        # iter_encoded : les générateurs NDJSON produisent des str
+        response.response = compression.compress_chunks(response.iter_encoded(), encoding)
+        if hasattr(chunks, 'close'):
+            response.call_on_close(chunks.close)
+    else:
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+        response.set_data(compression.compress(data, encoding))
+    response.content_encoding = encoding
+    return response
+
+@app.route('/metrics', methods=['GET'])
+@query_budget(0)
+def prometheus_metrics():
+    if not metrics.ENABLED:
+        return jsonify({'message': 'prometheus_client is not installed'}), 501
+    
+    token = app.config['METRICS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
         return jsonify({'message': 'Unauthorized access'}), 403
     
+    body, content_type = metrics.render()
+    return app.response_class(body, content_type=content_type)
+
+@app.route('/api/projects/<int:project_id>', methods=['PUT'])
+@query_budget(15)
+@admin_required
+def update_project(project_id):
     project = db.session.get(Project, project_id)
     if not project:
         return jsonify({'message': 'Project not found'}), 404
@@ -334,22 +1775,32 @@ def update_project(project_id):
     if 'description' in data and not data['description'].strip():
         return jsonify({'message': 'Description cannot be empty'}), 400
     
-    # Validation des tags
-    if 'tags' in data and not isinstance(data['tags'], list):
-        return jsonify({'message': 'Tags must be an array'}), 400
+    # Validation des tags (avant toute écriture en base)
+    if 'tags' in data:
+        tags_error = validate_tag_names(data['tags'])
+        if tags_error:
+            return jsonify({'message': tags_error}), 400
     
     # VALIDATION: Vérifier la taille de l'image si elle est présente
     if 'image' in data and data['image']:
         if len(data['image']) > 10 * 1024 * 1024:  # 10MB
             return jsonify({'message': 'Image too large. Maximum size is 10MB'}), 400
     
+    if 'image' in data:
+        try:
+            image, image_hash, image_mimetype = resolve_image(data['image'])
+        except storage.InvalidImage as e:
+            return jsonify({'message': str(e)}), 400
+    
     # Mise à jour des champs
     if 'title' in data:
         project.title = data['title'].strip()
     if 'description' in data:
         project.description = data['description'].strip()
     if 'image' in data:
-        project.image = data['image'].strip() if data['image'] else None
+        project.image = image
+        project.image_hash = image_hash
+        project.image_mimetype = image_mimetype
     if 'demoUrl' in data:
         project.demo_url = data['demoUrl'].strip() if data['demoUrl'] else None
     if 'repoUrl' in data:  
@@ -357,23 +1808,23 @@ def update_project(project_id):
     if 'featured' in data:
         project.featured = bool(data['featured'])
     
-    # Mise à jour des tags
+    # Mise à jour des tags : seuls les liens ajoutés ou retirés sont écrits dans project_tags
     if 'tags' in data:
-        # Vider les tags existants
-        project.tags.clear()
-        
-        for tag_name in data['tags']:
-            if not isinstance(tag_name, str):
-                return jsonify({'message': 'Tag names must be strings'}), 400
-            
-            tag_name = tag_name.strip()
-            if tag_name:  # Ignorer les tags vides
-                tag = Tag.query.filter_by(name=tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.session.add(tag)
+        tags = resolve_tags(data['tags'])
+        wanted = {tag.id for tag in tags}
+        current = {tag.id for tag in project.tags}
+        for tag in [tag for tag in project.tags if tag.id not in wanted]:
+            project.tags.remove(tag)
+        for tag in tags:
+            if tag.id not in current:
                 project.tags.append(tag)
     
+    if {'title', 'description', 'tags'} & data.keys():
+        index_project(project)
+    
+    # Nouvelle version du contenu dans la même transaction (ETag, cache)
+    bump_content_version('projects', 'tags')
+    
     try:
         db.session.commit()
     except Exception as e:
@@ -389,66 +1840,86 @@ def update_project(project_id):
         else:
             return jsonify({'message': f'Database error: {error_message}'}), 500
     
-    return jsonify({
-        'id': project.id,
-        'title': project.title,
-        'description': project.description,
-        'image': project.image,
-        'demoUrl': project.demo_url,
-        'repoUrl': project.repo_url,
-        'featured': project.featured,
-        'tags': [tag.name for tag in project.tags]
-    }), 200
+    if 'image' in data:
+        schedule_image_variants(image_hash)
+    refresh_snapshots()
+    
+    return jsonify(serialize_one(PROJECT_DETAIL, Project.id, project_id)), 200
 
-@app.route('/api/projects/<int:project_id>', methods=['DELETE'])
-@jwt_required()
-def delete_project(project_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+@app.route('/api/projects/<int:project_id>/image', methods=['PUT'])
+@query_budget(6)
+@admin_required
+def upload_project_image(project_id):
+    # Réception avant toute requête : pas de connexion SQL tenue pendant l'envoi du fichier
+    try:
+        image_hash, image_mimetype = receive_image_upload()
+    except storage.ImageTooLarge as e:
+        return jsonify({'message': str(e)}), 413
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    if not user or not user.is_admin:
-        return jsonify({'message': 'Unauthorized access'}), 403
+    project = db.session.get(Project, project_id)
+    if not project:
+        return jsonify({'message': 'Project not found'}), 404
+    
+    project.image = None
+    project.image_hash = image_hash
+    project.image_mimetype = image_mimetype
+    bump_content_version('projects')
+    db.session.commit()
+    
+    schedule_image_variants(image_hash)
+    refresh_snapshots()
     
+    return jsonify(serialize_one(PROJECT_DETAIL, Project.id, project_id)), 200
+
+@app.route('/api/projects/<int:project_id>', methods=['DELETE'])
+@query_budget(8)
+@admin_required
+def delete_project(project_id):
     project = Project.query.get_or_404(project_id)
+    unindex('projects', project.id)
     db.session.delete(project)
+    bump_content_version('projects', 'tags')
     db.session.commit()
+    refresh_snapshots()
     
     return jsonify({'message': 'Project deleted successfully'})
 
 # Tags routes
 @app.route('/api/tags', methods=['GET'])
+@query_budget(2)
+@cached_response('tags')
 def get_tags():
-    tags = Tag.query.all()
-    return jsonify([{'id': tag.id, 'name': tag.name} for tag in tags])
+    rows = db.session.execute(TAG_LIST.select())
+    return jsonify([TAG_LIST.to_dict(row) for row in rows])
 
 # Skills routes
 @app.route('/api/skills', methods=['GET'])
+@query_budget(2)
+@cached_response('skills', args=('category', 'limit', 'cursor'))
 def get_skills():
-    category = request.args.get('category')
-    
-    query = Skill.query
+    query = skill_list_select()
     
-    if category and category != 'all':
-        query = query.filter_by(category=category)
+    limit = pagination_args()
+    if limit is None:
+        rows = db.session.execute(query)
+        return jsonify([SKILL_DETAIL.to_dict(row) for row in rows])
     
-    skills = query.all()
+    try:
+        rows, next_cursor = keyset_page(query, Skill.id, limit)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    return jsonify([{
-        'id': skill.id,
-        'name': skill.name,
-        'level': skill.level,
-        'category': skill.category
-    } for skill in skills])
+    return jsonify({
+        'items': [SKILL_DETAIL.to_dict(row) for row in rows],
+        'next_cursor': next_cursor
+    })
 
 @app.route('/api/skills', methods=['POST'])
-@jwt_required()
+@query_budget(6)
+@admin_required
 def create_skill():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or not user.is_admin:
-        return jsonify({'message': 'Unauthorized access'}), 403
-    
     data = request.get_json()
     
     required_fields = ['name', 'level', 'category']
@@ -463,24 +1934,18 @@ def create_skill():
     )
     
     db.session.add(skill)
+    bump_content_version('skills')
+    db.session.flush()
+    skill_id = skill.id
     db.session.commit()
+    refresh_snapshots()
     
-    return jsonify({
-        'id': skill.id,
-        'name': skill.name,
-        'level': skill.level,
-        'category': skill.category
-    }), 201
+    return jsonify(serialize_one(SKILL_DETAIL, Skill.id, skill_id)), 201
 
 @app.route('/api/skills/<int:skill_id>', methods=['PUT'])
-@jwt_required()
+@query_budget(6)
+@admin_required
 def update_skill(skill_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or not user.is_admin:
-        return jsonify({'message': 'Unauthorized access'}), 403
-    
     skill = Skill.query.get_or_404(skill_id)
     data = request.get_json()
     
@@ -491,34 +1956,34 @@ def update_skill(skill_id):
     if 'category' in data:
         skill.category = data['category']
     
+    bump_content_version('skills')
     db.session.commit()
+    refresh_snapshots()
     
-    return jsonify({
-        'id': skill.id,
-        'name': skill.name,
-        'level': skill.level,
-        'category': skill.category
-    })
+    return jsonify(serialize_one(SKILL_DETAIL, Skill.id, skill_id))
 
 @app.route('/api/skills/<int:skill_id>', methods=['DELETE'])
-@jwt_required()
+@query_budget(5)
+@admin_required
 def delete_skill(skill_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or not user.is_admin:
-        return jsonify({'message': 'Unauthorized access'}), 403
-    
     skill = Skill.query.get_or_404(skill_id)
     db.session.delete(skill)
+    bump_content_version('skills')
     db.session.commit()
+    refresh_snapshots()
     
     return jsonify({'message': 'Skill deleted successfully'})
 
 # Contact routes
 @app.route('/api/contact', methods=['POST'])
+@query_budget(4)
 @cross_origin()
 def submit_contact():
+    # Taille et débit par IP vérifiés avant de lire le JSON
+    rejected = contact_precheck()
+    if rejected is not None:
+        return rejected
+    
     # Vérification que les données JSON sont présentes
     try:
         data = request.get_json()
@@ -527,79 +1992,61 @@ def submit_contact():
     except BadRequest:
         return jsonify({'message': 'Invalid JSON format'}), 400
     
-    # Validation des champs obligatoires
-    required_fields = ['name', 'email', 'subject', 'message']
-    for field in required_fields:
-        if field not in data or not data[field].strip():
-            return jsonify({'message': f'Missing or empty required field: {field}'}), 400
+    # Validation des champs obligatoires et de l'email
+    values, error = contact_values(data)
+    if error:
+        return jsonify({'message': error}), 400
     
-    # Validation de l'email
-    import re
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, data['email'].strip()):
-        return jsonify({'message': 'Invalid email format'}), 400
-    
-    contact = Contact(
-        name=data['name'].strip(),
-        email=data['email'].strip(),
-        subject=data['subject'].strip(),
-        message=data['message'].strip()
-    )
+    # Pot de miel, débit par email, doublons : tout est refusé avant l'écriture
+    rejected = contact_spam_check(data, values)
+    if rejected is not None:
+        return rejected
     
     try:
-        db.session.add(contact)
+        queued = save_contact(db.session, values)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Database error: {str(e)}'}), 500
+    remember_contact(values)
     
-    # Envoi de l'email de notification à l'admin
-    admin_email = app.config.get('ADMIN_EMAIL')
-    if admin_email:
-        email_subject = f"New Contact Form Submission: {data['subject']}"
-        email_body = f"""
-        <h2>New Contact Form Submission</h2>
-        <p><strong>Name:</strong> {data['name']}</p>
-        <p><strong>Email:</strong> {data['email']}</p>
-        <p><strong>Subject:</strong> {data['subject']}</p>
-        <p><strong>Message:</strong></p>
-        <p>{data['message']}</p>
-        """
-        send_email(admin_email, email_subject, email_body)
+    if queued:
+        wake_outbox_worker()
     
-    return jsonify({'message': 'Contact form submitted successfully'}), 201
+    return contact_accepted()
 
 @app.route('/api/contacts', methods=['GET'])
-@jwt_required()
+@query_budget(2)
+@admin_required
 def get_contacts():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    limit = pagination_args()
+    if limit is None:
+        return json_array_response(CONTACT_ADMIN.select().order_by(Contact.created_at.desc()), CONTACT_ADMIN.to_dict)
     
-    if not user or not user.is_admin:
-        return jsonify({'message': 'Unauthorized access'}), 403
-    
-    contacts = Contact.query.order_by(Contact.created_at.desc()).all()
+    # Plus récents d'abord : les id suivent l'ordre d'insertion, donc celui de created_at,
+    # sans dépendre de la précision du timestamp (SQLite ne stocke que la seconde avec now())
+    try:
+        rows, next_cursor = keyset_page(CONTACT_ADMIN.select(), Contact.id, limit, descending=True)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    return jsonify([{
-        'id': contact.id,
-        'name': contact.name,
-        'email': contact.email,
-        'subject': contact.subject,
-        'message': contact.message,
-        'read': contact.read,
-        'created_at': contact.created_at.isoformat()
-    } for contact in contacts])
+    return jsonify({
+        'items': [CONTACT_ADMIN.to_dict(row) for row in rows],
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/contacts/unread-count', methods=['GET'])
+@query_budget(2)
+@admin_required
+def get_unread_contacts_count():
+    count = db.session.query(db.func.count(Contact.id)).filter(Contact.read.is_(False)).scalar()
+    return jsonify({'unread': count})
 
 @app.route('/api/contacts/<int:contact_id>', methods=['PUT'])
+@query_budget(3)
 #@cross_origin()
-@jwt_required()
+@admin_required
 def mark_contact_read(contact_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or not user.is_admin:
-        return jsonify({'message': 'Unauthorized access'}), 403
-    
     contact = Contact.query.get_or_404(contact_id)
     contact.read = True
     db.session.commit()
@@ -607,28 +2054,147 @@ def mark_contact_read(contact_id):
     return jsonify({'message': 'Contact marked as read'})
 
 @app.route('/api/contacts/<int:contact_id>', methods=['DELETE'])
-@jwt_required()
+@query_budget(4)
+@admin_required
 def delete_contact(contact_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or not user.is_admin:
-        return jsonify({'message': 'Unauthorized access'}), 403
-    
     contact = Contact.query.get_or_404(contact_id)
+    unindex('contacts', contact.id)
     db.session.delete(contact)
     db.session.commit()
     
     return jsonify({'message': 'Contact deleted successfully'})
 
+# Bulk import / export routes
+@app.route('/api/bulk/projects', methods=['POST'])
+@query_budget(None, allow_repeats=True)
+@admin_required
+def import_projects():
+    return bulk_import(validate_project_record, insert_projects)
+
+@app.route('/api/bulk/projects', methods=['GET'])
+@query_budget(None, allow_repeats=True)
+@admin_required
+def export_projects():
+    # ?images=inline : images stockées exportées en data URI, pour un import dans un autre environnement
+    serializer = PROJECT_EXPORT_INLINE if request.args.get('images') == 'inline' else PROJECT_EXPORT
+    
+    def records():
+        rows = db.session.execute(serializer.select().order_by(Project.id),
+                                  execution_options={'yield_per': app.config['BULK_BATCH_SIZE']})
+        return map(serializer.to_dict, rows)
+    
+    return ndjson_response(records())
+
+@app.route('/api/bulk/skills', methods=['POST'])
+@query_budget(None, allow_repeats=True)
+@admin_required
+def import_skills():
+    return bulk_import(validate_skill_record, insert_skills)
+
+@app.route('/api/bulk/skills', methods=['GET'])
+@query_budget(None, allow_repeats=True)
+@admin_required
+def export_skills():
+    def records():
+        rows = db.session.execute(SKILL_EXPORT.select().order_by(Skill.id),
+                                  execution_options={'yield_per': app.config['BULK_BATCH_SIZE']})
+        return map(SKILL_EXPORT.to_dict, rows)
+    
+    return ndjson_response(records())
+
+# Health route
+@app.route('/api/health', methods=['GET'])
+@query_budget(1)
+def health():
+    """Liveness of this worker and its database pool (for load balancers and monitoring)."""
+    try:
+        db.session.execute(db.text('SELECT 1'))
+        database = 'ok'
+    except Exception as e:
+        logger.warning('Health check failed: %s', e)
+        database = 'unavailable'
+    
+    return jsonify({
+        'status': 'ok' if database == 'ok' else 'degraded',
+        'database': database,
+        'pool': dbpool.stats.snapshot(db.engine.pool),
+    }), 200 if database == 'ok' else 503
+
+# Search route
+@app.route('/api/search', methods=['GET'])
+@query_budget(6)
+def search_content():
+    terms = search.parse_terms(request.args.get('q', ''))
+    if not terms:
+        return jsonify({'message': 'Missing search query'}), 400
+    
+    backend = search_backend()
+    if backend is None:
+        return jsonify({'message': 'Search is not available on this database'}), 501
+    
+    limit = request.args.get('limit', SEARCH_DEFAULT_LIMIT, type=int)
+    if limit < 1 or limit > SEARCH_MAX_LIMIT:
+        return jsonify({'message': f'limit must be between 1 and {SEARCH_MAX_LIMIT}'}), 400
+    
+    # Les messages de contact ne sont cherchés que pour un admin
+    is_admin = has_admin_token()
+    kinds = [request.args['type']] if request.args.get('type') else ['projects', 'contacts'] if is_admin else ['projects']
+    if any(kind not in search.TABLES for kind in kinds):
+        return jsonify({'message': f"Invalid type. Allowed: {', '.join(search.TABLES)}"}), 400
+    if 'contacts' in kinds and not is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    results = {}
+    if 'projects' in kinds:
+        ids = backend.search(db.session, 'projects', terms, limit)
+        rows = db.session.execute(PROJECT_SUMMARY.select().where(Project.id.in_(ids))) if ids else []
+        projects = {row.id: PROJECT_SUMMARY.to_dict(row) for row in rows}
+        results['projects'] = [projects[i] for i in ids if i in projects]
+    if 'contacts' in kinds:
+        ids = backend.search(db.session, 'contacts', terms, limit)
+        rows = db.session.execute(CONTACT_ADMIN.select().where(Contact.id.in_(ids))) if ids else []
+        contacts = {row.id: CONTACT_ADMIN.to_dict(row) for row in rows}
+        results['contacts'] = [contacts[i] for i in ids if i in contacts]
+    
+    return jsonify(results)
+
 # --- Frontend route (React SPA) ---
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
+@query_budget(0)
 def serve(path):
     if path != "" and os.path.exists(os.path.join(app.static_folder, path)):
-        return send_from_directory(app.static_folder, path)
+        return send_static(path)
     else:
-        return send_from_directory(app.static_folder, "index.html")
+        return send_static("index.html")
+
+# Fichiers du build Vite dont le nom contient un hash du contenu (assets/index-B2Hl3Na5.js)
+HASHED_ASSET_RE = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8}\.\w+$')
+
+def send_static(path):
+    """Send a file of the frontend build, or its .br/.gz sibling (made at build time) if accepted."""
+    siblings = []
+    for encoding, extension in compression.ENCODINGS:
+        sibling = safe_join(app.static_folder, path + extension)
+        if sibling and os.path.isfile(sibling):
+            siblings.append(encoding)
+    encoding = compression.best_encoding(request.accept_encodings, siblings)
+    filename = path + dict(compression.ENCODINGS)[encoding] if encoding else path
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    
+    if HASHED_ASSET_RE.match(path):
+        # Un nouveau contenu aura un nouveau nom : le navigateur ne revalide jamais
+        response = send_from_directory(app.static_folder, filename, mimetype=mimetype, max_age=31536000)
+        response.cache_control.immutable = True
+    else:
+        # index.html référence les noms hashés du dernier build : toujours revalidé
+        response = send_from_directory(app.static_folder, filename, mimetype=mimetype)
+        response.cache_control.no_cache = True
+    if encoding:
+        response.content_encoding = encoding
+    if siblings:
+        response.vary.add('Accept-Encoding')
+    return response
 
 # Admin user creation
 @app.cli.command('create-admin')
@@ -655,5 +2221,174 @@ def create_admin():
     
     _create_admin()
 
+@app.cli.command('revoke-tokens')
+@click.argument('username')
+def revoke_tokens(username):
+    """Invalidate every token already issued to a user."""
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        print(f'No user named {username}')
+        return
+    
+    user.token_version += 1
+    db.session.commit()
+    print(f"Tokens of {username} revoked (effective within {app.config['TOKEN_VERSION_TTL']}s on every worker)")
+
+@app.cli.command('send-emails')
+@click.option('--once', is_flag=True, help='Deliver the due emails and exit.')
+def send_emails(once):
+    """Deliver the email outbox (run as a dedicated process with MAIL_QUEUE_WORKER=none)."""
+    while True:
+        sent = deliver_outbox()
+        if sent:
+            print(f'Sent {sent} emails')
+        if once and sent < app.config['MAIL_BATCH_SIZE']:
+            return
+        if sent < app.config['MAIL_BATCH_SIZE']:
+            time.sleep(app.config['MAIL_POLL_INTERVAL'])
+
+@app.cli.command('generate-image-variants')
+def generate_image_variants():
+    """Generate missing resized variants for every stored project image."""
+    if storage.Image is None:
+        print('Pillow is not installed, no variants generated')
+        return
+    
+    hashes = [row[0] for row in db.session.query(Project.image_hash).filter(Project.image_hash.isnot(None)).distinct()]
+    for image_hash in hashes:
+        storage.generate_variants(app.config['UPLOAD_FOLDER'], image_hash, app.config['IMAGE_VARIANT_WIDTHS'])
+    print(f'Generated variants for {len(hashes)} images')
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild the full-text search index from the projects and contacts."""
+    rebuild_search_index()
+    print('Search index rebuilt')
+
+# Routes en lecture exécutées par check-query-budgets (les autres écrivent en base)
+QUERY_BUDGET_CHECKS = [
+    '/api/projects', '/api/projects?view=summary', '/api/projects?featured=true', '/api/projects?limit=20',
+    '/api/tags', '/api/skills', '/api/skills?limit=20',
+    '/api/contacts', '/api/contacts?limit=20', '/api/contacts/unread-count',
+    '/api/search?q=a', '/api/health',
+]
+
+@app.cli.command('check-query-budgets')
+def check_query_budgets():
+    """Check that every route declares @query_budget and that the read routes respect it."""
+    global response_cache
+    failures = 0
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint != 'static' and not hasattr(app.view_functions[rule.endpoint], 'query_budget'):
+            print(f'FAIL {rule.rule} ({rule.endpoint}) has no @query_budget')
+            failures += 1
+    
+    headers = {}
+    admin = User.query.filter_by(is_admin=True).first()
+    if admin:
+        token = create_access_token(identity=str(admin.id),
+                                    additional_claims={'is_admin': True, 'token_version': admin.token_version})
+        headers['Authorization'] = f'Bearer {token}'
+    urls = list(QUERY_BUDGET_CHECKS)
+    first_project = db.session.query(Project.id).order_by(Project.id).first()
+    if first_project:
+        urls.append(f'/api/projects/{first_project[0]}')
+    
+    # Mesure du pire cas : ni snapshot, ni cache de réponses, ni version de jeton en mémoire
+    saved = app.config['SNAPSHOTS'], app.config['QUERY_BUDGET'], response_cache
+    app.config['SNAPSHOTS'], app.config['QUERY_BUDGET'], response_cache = False, 'off', None
+    try:
+        client = app.test_client()
+        for url in urls:
+            _token_versions.clear()
+            with recorded_statements() as statements:
+                response = client.get(url, headers=headers)
+                # Les listes en streaming exécutent leurs requêtes pendant la lecture du corps
+                response.get_data()
+                response.close()
+            view = app.view_functions[app.url_map.bind('').match(url.split('?')[0])[0]]
+            problems = query_budget_problems(view, [statement for statement, _ in statements])
+            if response.status_code >= 400:
+                problems.append(f'status {response.status_code}')
+            failures += bool(problems)
+            budget = getattr(view, 'query_budget', None)
+            print(f"{'FAIL' if problems else 'ok  '} {url}: {len(statements)} statements (budget {budget})")
+            for problem in problems:
+                print('    ' + problem)
+    finally:
+        app.config['SNAPSHOTS'], app.config['QUERY_BUDGET'], response_cache = saved
+    if failures:
+        raise SystemExit(1)
+
+# Requêtes qui doivent utiliser un index : (URL, index attendu dans le plan)
+QUERY_PLAN_CHECKS = [
+    ('/api/projects?featured=true', 'ix_projects_featured'),
+    ('/api/projects?tag=python', 'ix_project_tags_tag_id_project_id'),
+    ('/api/skills?category=backend', 'ix_skills_category'),
+    ('/api/contacts', 'ix_contacts_created_at'),
+    ('/api/contacts/unread-count', 'ix_contacts_unread'),
+]
+
+@contextmanager
+def recorded_statements():
+    """Collect the (statement, parameters) executed inside the block."""
+    statements = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+def captured_statements(url):
+    """Run the view behind `url` (without auth or caching) and return its SQL statements."""
+    with recorded_statements() as statements, app.test_request_context(url):
+        view = app.view_functions[request.endpoint]
+        make_response(view.__wrapped__()).get_data()
+    return statements
+
+def query_plan(statement, parameters):
+    """Return the plan chosen by the database for one statement, as text."""
+    with db.engine.connect() as conn:
+        if conn.dialect.name == 'postgresql':
+            # Sur une base presque vide, PostgreSQL préfère toujours le seq scan :
+            # on vérifie que l'index est utilisable, pas qu'il est rentable
+            conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+            rows = conn.exec_driver_sql('EXPLAIN ' + statement, parameters).all()
+        else:
+            rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+        conn.rollback()
+    return '\n'.join(str(row[-1]) for row in rows)
+
+@app.cli.command('check-query-plans')
+@click.option('--verbose', is_flag=True, help='Print the plan of every statement.')
+def check_query_plans(verbose):
+    """Check that the API queries use their indexes (SQLite and PostgreSQL)."""
+    failures = 0
+    for url, index in QUERY_PLAN_CHECKS:
+        plans = [query_plan(statement, parameters) for statement, parameters in captured_statements(url)]
+        ok = any(index in plan for plan in plans)
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {url} -> {index}")
+        if verbose or not ok:
+            for plan in plans:
+                print('    ' + plan.replace('\n', '\n    '))
+    if failures:
+        raise SystemExit(1)
+
+@app.cli.command('build-snapshots')
+@click.option('--base-url', default=None, help='Public URL of the API, e.g. https://example.com/')
+def build_snapshots(base_url):
+    """Regenerate the pre-rendered JSON snapshots of the public routes."""
+    base_url = base_url or app.config['SNAPSHOT_BASE_URL']
+    if not base_url:
+        print('Set --base-url or SNAPSHOT_BASE_URL')
+        return
+    refresh_snapshots(base_url)
+    print(f"Snapshots written to {app.config['SNAPSHOT_FOLDER']}")
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
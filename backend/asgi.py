@@ -0,0 +1,355 @@
+# asgi.py - Mode de service ASGI : lectures publiques et formulaire de contact en asynchrone
+#
+#   SERVER_MODE=asgi gunicorn        (gunicorn.conf.py choisit alors le worker uvicorn)
+#   uvicorn asgi:app --port 5000     (développement)
+#
+# Les vues de ASYNC_VIEWS utilisent une session SQLAlchemy asynchrone (aiosqlite,
+# asyncpg) : pendant chaque aller-retour SQL, le worker sert d'autres clients.
+# Elles s'exécutent dans un contexte de requête Flask, donc avec les mêmes hooks
+# (CORS, métriques, journal d'accès, budget SQL), snapshots, ETags et cache de
+# réponses que les vues Flask. Toutes les autres routes sont transmises telles
+# quelles à l'application Flask, exécutée dans un pool de threads.
+#
+# Les appels à Redis (cache de réponses, limiteurs et doublons partagés) sont
+# bloquants : ils passent par un thread (blocking) pour ne pas arrêter la boucle.
+import asyncio
+import io
+
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask import jsonify, request
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from werkzeug.exceptions import BadRequest, HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+import app as portfolio
+import cache
+import dbpool
+import jsonstream
+import metrics
+import ratelimit
+from app import (
+    PROJECT_DETAIL, PROJECT_SCHEMA, SKILL_DETAIL, TAG_LIST, Project, Skill, cache_response_body,
+    contact_accepted, contact_precheck, contact_spam_check, contact_values, content_state,
+    content_state_select, db, is_not_modified, keyset_select, keyset_split, not_modified_response,
+    pagination_args, project_list_select, remember_contact, request_key, response_etag, save_contact,
+    set_public_cache_headers, skill_list_select, snapshot_response, wake_outbox_worker,
+)
+
+flask_app = portfolio.app
+
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+# Corps lu en mémoire pour les vues asynchrones (formulaire de contact)
+MAX_BODY_SIZE = 1024 * 1024
+# Backends qui font un aller-retour réseau à chaque appel
+SHARED_BACKENDS = (cache.SharedCache, ratelimit.SharedTokenBucket, ratelimit.SharedSlidingWindow)
+
+
+def create_engine():
+    """Async engine on the same database as Flask-SQLAlchemy, with the same pool settings."""
+    config = flask_app.config
+    with flask_app.app_context():
+        # URL résolue par Flask-SQLAlchemy (chemin SQLite relatif au dossier instance)
+        url = db.engine.url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No async driver for {backend} databases')
+
+    if backend == 'sqlite':
+        # Le défaut aiosqlite (NullPool) ouvrirait une connexion et un thread par requête
+        options = {'poolclass': AsyncAdaptedQueuePool}
+    else:
+        # Réglages DB_* de app.engine_options ; connect_args au format asyncpg
+        options = dict(portfolio.engine_options(config), poolclass=dbpool.InstrumentedAsyncQueuePool,
+                       connect_args={'timeout': config['DB_CONNECT_TIMEOUT']})
+        if config['DB_STATEMENT_TIMEOUT_MS']:
+            options['connect_args']['server_settings'] = {
+                'statement_timeout': str(config['DB_STATEMENT_TIMEOUT_MS'])}
+    return create_async_engine(url.set(drivername=ASYNC_DRIVERS[backend]), **options)
+
+
+# Créés au premier appel dans la boucle d'événements du worker (jamais hérités d'un fork)
+_engine = None
+_sessionmaker = None
+
+
+def session_factory():
+    global _engine, _sessionmaker
+    if _sessionmaker is None:
+        _engine = create_engine()
+        _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    return _sessionmaker
+
+
+def is_shared(*backends):
+    return any(isinstance(backend, SHARED_BACKENDS) for backend in backends)
+
+
+async def blocking(backends, func, *args):
+    """Call func(*args) in a thread if one of `backends` is shared (Redis), else inline.
+
+    asyncio.to_thread copies the context variables, so the Flask request
+    context is available in the thread.
+    """
+    if is_shared(*backends):
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+async def cached_response(session, endpoint, render):
+    """Async counterpart of app.cached_response: snapshot, 304, response cache, then render()."""
+    if flask_app.config['SNAPSHOTS']:
+        snapshot = portfolio.snapshot_store.lookup(request_key(), request.host_url, request.accept_encodings)
+        metrics.observe_cache('snapshot', snapshot is not None)
+        if snapshot is not None:
+            return snapshot_response(*snapshot)
+
+    tables = flask_app.view_functions[endpoint].content_tables
+    versions, last_modified = content_state(tables, await session.execute(content_state_select(tables)))
+    etag = response_etag(versions)
+
+    not_modified = is_not_modified(etag, last_modified)
+    metrics.observe_cache('conditional', not_modified)
+    if not_modified:
+        return not_modified_response(etag, last_modified)
+
+    # Même clé que la vue Flask : les deux modes partagent les corps en cache
+    response_cache = portfolio.response_cache
+    key = f'{endpoint}:{etag}'
+    body = await blocking([response_cache], response_cache.get, key) if response_cache is not None else None
+    if response_cache is not None:
+        metrics.observe_cache('response', body is not None)
+    if body is not None:
+        response = flask_app.response_class(body, mimetype='application/json')
+    else:
+        response = flask_app.make_response(await render())
+        if response.status_code != 200:
+            return response
+        if response_cache is not None:
+            await blocking([response_cache], cache_response_body, response, response_cache, key)
+
+    return set_public_cache_headers(response, etag, last_modified)
+
+
+def json_array(rows, serialize):
+    # Mêmes octets que app.json_array_response : lignes déjà lues, JSON produit par morceaux
+    return flask_app.response_class(jsonstream.array_chunks(rows, serialize), mimetype='application/json')
+
+
+async def get_projects(session):
+    async def render():
+        serializer, query = project_list_select()
+        if serializer is None:
+            return jsonify({'message': f"Invalid fields. Allowed: {', '.join(PROJECT_SCHEMA.fields)}"}), 400
+
+        limit = pagination_args()
+        if limit is None:
+            return json_array(await session.execute(query), serializer.to_dict)
+
+        try:
+            page = keyset_select(query, Project.id, limit)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        rows, next_cursor = keyset_split((await session.execute(page)).all(), Project.id, limit)
+        return jsonify({
+            'items': [serializer.to_dict(row) for row in rows],
+            'next_cursor': next_cursor
+        })
+
+    return await cached_response(session, 'get_projects', render)
+
+
+async def get_project(session, project_id):
+    async def render():
+        row = (await session.execute(PROJECT_DETAIL.select().where(Project.id == project_id))).first()
+        if row is None:
+            return jsonify({'message': 'Project not found'}), 404
+        return jsonify(PROJECT_DETAIL.to_dict(row))
+
+    return await cached_response(session, 'get_project', render)
+
+
+async def get_tags(session):
+    async def render():
+        rows = await session.execute(TAG_LIST.select())
+        return jsonify([TAG_LIST.to_dict(row) for row in rows])
+
+    return await cached_response(session, 'get_tags', render)
+
+
+async def get_skills(session):
+    async def render():
+        query = skill_list_select()
+        limit = pagination_args()
+        if limit is None:
+            rows = await session.execute(query)
+            return jsonify([SKILL_DETAIL.to_dict(row) for row in rows])
+
+        try:
+            page = keyset_select(query, Skill.id, limit)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        rows, next_cursor = keyset_split((await session.execute(page)).all(), Skill.id, limit)
+        return jsonify({
+            'items': [SKILL_DETAIL.to_dict(row) for row in rows],
+            'next_cursor': next_cursor
+        })
+
+    return await cached_response(session, 'get_skills', render)
+
+
+async def submit_contact(session):
+    rejected = await blocking([portfolio.contact_ip_limiter], contact_precheck)
+    if rejected is not None:
+        return rejected
+
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'message': 'No JSON data provided'}), 400
+    except BadRequest:
+        return jsonify({'message': 'Invalid JSON format'}), 400
+
+    values, error = contact_values(data)
+    if error:
+        return jsonify({'message': error}), 400
+
+    rejected = await blocking([portfolio.contact_email_limiter, portfolio.contact_fingerprints],
+                              contact_spam_check, data, values)
+    if rejected is not None:
+        return rejected
+
+    try:
+        # Même écriture que la vue Flask, exécutée sur la façade synchrone de la session
+        queued = await session.run_sync(save_contact, values)
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        return jsonify({'message': f'Database error: {str(e)}'}), 500
+    await blocking([portfolio.contact_fingerprints], remember_contact, values)
+
+    if queued:
+        wake_outbox_worker()
+
+    return contact_accepted()
+
+
+# Endpoint Flask -> vue asynchrone ; le routage reste celui de app.url_map
+ASYNC_VIEWS = {
+    'get_projects': get_projects,
+    'get_project': get_project,
+    'get_tags': get_tags,
+    'get_skills': get_skills,
+    'submit_contact': submit_contact,
+}
+
+_url_adapter = flask_app.url_map.bind('localhost')
+# Même réécriture de l'environ que le ProxyFix de app.py (TRUSTED_PROXIES), qui
+# n'est traversé que par les routes transmises à Flask
+_proxy_fix = ProxyFix(lambda environ, start_response: environ, x_for=flask_app.config['TRUSTED_PROXIES'],
+                      x_proto=flask_app.config['TRUSTED_PROXIES']) if flask_app.config['TRUSTED_PROXIES'] else None
+_wsgi_app = WsgiToAsgi(flask_app)
+
+
+def match(scope):
+    """Return (async view, view args) for an HTTP scope, or (None, None) to fall back to Flask."""
+    if scope['method'] == 'OPTIONS':
+        # Réponse OPTIONS automatique et préflight CORS (@cross_origin) : ceux de Flask
+        return None, None
+    try:
+        endpoint, view_args = _url_adapter.match(scope['path'], method=scope['method'])
+    except HTTPException:
+        # 404, 405, redirections : réponses produites par Flask
+        return None, None
+    return ASYNC_VIEWS.get(endpoint), view_args
+
+
+async def read_body(receive):
+    """Read the request body; None if it exceeds MAX_BODY_SIZE."""
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY_SIZE:
+            return None
+        if not message.get('more_body'):
+            return bytes(body)
+
+
+async def send_response(send, scope, status, headers, chunks=(), offload=False):
+    """Send a response, one message per chunk; `offload` reads the chunks in a thread."""
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    })
+    if scope['method'] != 'HEAD':
+        # Un message par morceau : le corps n'est jamais assemblé en mémoire
+        chunks = iter(chunks)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None) if offload else next(chunks, None)
+            if chunk is None:
+                break
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def dispatch(scope, body, view, view_args, send):
+    """Run an async view inside a Flask request context (like full_dispatch_request) and send the response."""
+    # Même environ WSGI que pour les routes transmises à Flask
+    adapter = WsgiToAsgiInstance(flask_app)
+    adapter.scope = scope
+    environ = adapter.build_environ(scope, io.BytesIO(body))
+    # Corps déjà lu en entier : sa taille vaut Content-Length, même envoyé en chunked
+    environ['CONTENT_LENGTH'] = str(len(body))
+    if _proxy_fix is not None:
+        environ = _proxy_fix(environ, None)
+    with flask_app.request_context(environ):
+        try:
+            try:
+                rv = flask_app.preprocess_request()
+                if rv is None:
+                    async with session_factory()() as session:
+                        rv = await view(session, **view_args)
+            except Exception as e:
+                rv = flask_app.handle_user_exception(e)
+            response = flask_app.finalize_request(rv)
+        except Exception as e:
+            response = flask_app.handle_exception(e)
+        # Corps lu pendant l'envoi, dans le contexte de la requête (comme stream_with_context) ;
+        # un flux mis en cache en fin de lecture (cache_when_complete) écrit dans Redis
+        offload = response.is_streamed and is_shared(portfolio.response_cache)
+        try:
+            await send_response(send, scope, response.status_code, response.headers.to_wsgi_list(),
+                                response.iter_encoded(), offload)
+        finally:
+            response.close()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _engine is not None:
+                await _engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    view, view_args = match(scope) if scope['type'] == 'http' else (None, None)
+    if view is None:
+        return await _wsgi_app(scope, receive, send)
+
+    body = await read_body(receive)
+    if body is None:
+        await send_response(send, scope, 413, [('Content-Type', 'application/json')],
+                            [b'{"message":"Request body too large"}\n'])
+    else:
+        await dispatch(scope, body, view, view_args, send)
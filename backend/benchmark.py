@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+# benchmark.py - Mesure des routes de l'API (client de test Flask, gunicorn WSGI ou ASGI) et comparaison
+#
+#   python benchmark.py run --output baseline.json
+#   python benchmark.py run --mode gunicorn --workers 2 --concurrency 8 --output current.json
+#   python benchmark.py compare baseline.json current.json
+#
+#   python benchmark.py run --mode gunicorn --concurrency 64 --output wsgi.json
+#   python benchmark.py run --mode asgi --concurrency 64 --output asgi.json
+#   python benchmark.py compare wsgi.json asgi.json
+#
+# Chaque exécution crée une base SQLite temporaire remplie par seed.generate_data(),
+# sauf si --database-uri est donné (la base doit alors être vide).
+import argparse
+import http.client
+import json
+import os
+import platform
+import resource
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import quote
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ADMIN_USERNAME = 'bench-admin'
+ADMIN_PASSWORD = 'bench-password'
+
+
+def scenarios(ids):
+    """(name, method, url, admin, body, weight): every route, writes with a lower weight.
+
+    `ids` holds existing identifiers (project, contact, image hash, tag).
+    Creates run last and rarely so they barely change the dataset read by
+    the other routes.
+    """
+    tag = quote(ids['tag'])
+    routes = [
+        ('projects', 'GET', '/api/projects', False, None, 1.0),
+        ('projects_summary', 'GET', '/api/projects?view=summary', False, None, 1.0),
+        ('projects_featured', 'GET', '/api/projects?featured=true', False, None, 1.0),
+        ('projects_by_tag', 'GET', f'/api/projects?tag={tag}', False, None, 1.0),
+        ('projects_page', 'GET', '/api/projects?limit=50', False, None, 1.0),
+        ('project', 'GET', f"/api/projects/{ids['project']}", False, None, 1.0),
+        ('tags', 'GET', '/api/tags', False, None, 1.0),
+        ('skills', 'GET', '/api/skills', False, None, 1.0),
+        ('skills_by_category', 'GET', '/api/skills?category=backend', False, None, 1.0),
+        ('search', 'GET', '/api/search?q=react', False, None, 1.0),
+        ('search_admin', 'GET', '/api/search?q=stripe', True, None, 1.0),
+        ('contacts', 'GET', '/api/contacts', True, None, 0.2),
+        ('contacts_page', 'GET', '/api/contacts?limit=50', True, None, 1.0),
+        ('contacts_unread_count', 'GET', '/api/contacts/unread-count', True, None, 1.0),
+        ('health', 'GET', '/api/health', False, None, 1.0),
+        ('metrics', 'GET', '/metrics', False, None, 0.2),
+        ('export_skills', 'GET', '/api/bulk/skills', True, None, 0.2),
+        ('export_projects', 'GET', '/api/bulk/projects', True, None, 0.1),
+        ('mark_contact_read', 'PUT', f"/api/contacts/{ids['contact']}", True, None, 0.2),
+        ('submit_contact', 'POST', '/api/contact', False,
+         {'name': 'Bench', 'email': 'bench@example.com', 'subject': 'Benchmark', 'message': 'Hello'}, 0.2),
+        ('create_skill', 'POST', '/api/skills', True, {'name': 'Bench', 'level': 50, 'category': 'tools'}, 0.1),
+        ('update_project', 'PUT', f"/api/projects/{ids['project']}", True, {'featured': True}, 0.1),
+        ('create_project', 'POST', '/api/projects', True,
+         {'title': 'Bench project', 'description': 'Created by the benchmark', 'tags': [ids['tag']]}, 0.1),
+        ('login', 'POST', '/api/login', False, {'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD}, 0.1),
+    ]
+    if ids.get('image'):
+        routes.append(('image', 'GET', f"/api/images/{ids['image']}", False, None, 1.0))
+        routes.append(('image_variant', 'GET', f"/api/images/{ids['image']}/320.webp", False, None, 1.0))
+    return routes
+
+
+def prepare_database(args):
+    """Create the schema, an admin and the generated dataset; return the ids used by the scenarios."""
+    from app import app, db, User, Project, Contact, Tag, search_backend
+    import seed
+
+    with app.app_context():
+        db.create_all()
+        admin = User(username=ADMIN_USERNAME, email='bench@example.com', is_admin=True)
+        admin.set_password(ADMIN_PASSWORD)
+        db.session.add(admin)
+        db.session.commit()
+
+        seed.generate_data(args.projects, args.tags, args.skills, args.contacts, args.images, args.seed)
+        return {
+            'project': db.session.query(Project.id).order_by(Project.id).first()[0],
+            'contact': db.session.query(Contact.id).order_by(Contact.id).first()[0],
+            'tag': db.session.query(Tag.name).order_by(Tag.id).first()[0],
+            'image': db.session.query(Project.image_hash).filter(Project.image_hash.isnot(None)).limit(1).scalar(),
+            'search': search_backend() is not None,
+        }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else None,
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+    }
+
+
+def run_client(routes, args):
+    """Drive every route in-process through the Flask test client (one request at a time)."""
+    from app import app
+
+    client = app.test_client()
+    token = client.post('/api/login', json={'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD}).get_json()['access_token']
+    admin_headers = {'Authorization': f'Bearer {token}'}
+
+    results = {}
+    for name, method, url, admin, body, weight in routes:
+        count = max(1, int(args.requests * weight))
+        headers = admin_headers if admin else {}
+        for _ in range(args.warmup):
+            client.open(url, method=method, json=body, headers=headers)
+
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for _ in range(count):
+            request_started = time.perf_counter()
+            response = client.open(url, method=method, json=body, headers=headers)
+            response.get_data()
+            latencies.append(time.perf_counter() - request_started)
+            if response.status_code >= 400:
+                errors += 1
+        results[name] = summarize(latencies, errors, time.perf_counter() - started)
+        print(f"{name:24} p50 {results[name]['p50_ms']:>9} ms  p95 {results[name]['p95_ms']:>9} ms  "
+              f"{results[name]['throughput_rps']:>9} req/s")
+
+    # ru_maxrss est en Ko sous Linux
+    peak_rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return results, peak_rss_mb
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_hwm_mb(pid):
+    """Peak RSS (VmHWM) summed over a process and its children, from /proc (Linux only)."""
+    total_kb = 0
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        return None
+    for child in pids:
+        try:
+            with open(f'/proc/{child}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+class HttpSession(threading.local):
+    """One keep-alive HTTP connection per load-generator thread."""
+
+    def __init__(self, port):
+        self.port = port
+        self.connection = None
+
+    def request(self, method, url, body, headers):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            self.connection.request(method, url, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            self.connection = None
+            raise
+
+
+def run_gunicorn(routes, args, env):
+    """Start gunicorn on the prepared database and load it with `concurrency` client threads.
+
+    In asgi mode the workers are uvicorn workers serving asgi:app.
+    """
+    port = free_port()
+    command = [sys.executable, '-m', 'gunicorn', '-b', f'127.0.0.1:{port}', '-w', str(args.workers)]
+    if args.mode == 'asgi':
+        command += ['-k', 'uvicorn.workers.UvicornWorker', 'asgi:app']
+    else:
+        command.append('app:app')
+    process = subprocess.Popen(
+        command,
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        session = HttpSession(port)
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if session.request('GET', '/api/health', None, {}) == 200:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > deadline or process.poll() is not None:
+                raise RuntimeError('gunicorn did not start')
+            time.sleep(0.2)
+
+        login = json.dumps({'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD})
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        connection.request('POST', '/api/login', body=login, headers={'Content-Type': 'application/json'})
+        token = json.loads(connection.getresponse().read())['access_token']
+        connection.close()
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            for name, method, url, admin, body, weight in routes:
+                count = max(1, int(args.requests * weight))
+                headers = {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip, br'}
+                if admin:
+                    headers['Authorization'] = f'Bearer {token}'
+                payload = json.dumps(body) if body is not None else None
+
+                def one(_):
+                    started = time.perf_counter()
+                    try:
+                        status = session.request(method, url, payload, headers)
+                    except (http.client.HTTPException, OSError):
+                        status = 599
+                    return time.perf_counter() - started, status
+
+                list(executor.map(one, range(args.warmup)))
+                started = time.perf_counter()
+                outcomes = list(executor.map(one, range(count)))
+                elapsed = time.perf_counter() - started
+                results[name] = summarize([latency for latency, _ in outcomes],
+                                          sum(status >= 400 for _, status in outcomes), elapsed)
+                print(f"{name:24} p50 {results[name]['p50_ms']:>9} ms  p95 {results[name]['p95_ms']:>9} ms  "
+                      f"{results[name]['throughput_rps']:>9} req/s")
+
+        return results, process_tree_hwm_mb(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='portfolio-bench-')
+    # Réglages fixés avant l'import de app (lus à l'import) et transmis à gunicorn
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URI': args.database_uri or f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'UPLOAD_FOLDER': os.path.join(workdir, 'uploads'),
+        'SNAPSHOT_FOLDER': os.path.join(workdir, 'snapshots'),
+        'SNAPSHOTS': 'True' if args.snapshots else 'False',
+        'SNAPSHOT_BASE_URL': 'http://localhost/',
+        'MAIL_QUEUE_WORKER': 'none',
+        'ADMIN_EMAIL': '',
+        'ACCESS_LOG_SAMPLE_RATE': '0',
+        'QUERY_BUDGET': 'off',
+        # Scénarios login et contact : le hachage et l'écriture, pas des 429 ou des doublons
+        'LOGIN_RATE_LIMIT': 'none',
+        'CONTACT_RATE_LIMIT': 'none',
+        'LOG_LEVEL': 'WARNING',
+        'GUNICORN_PRELOAD': 'True',
+    })
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    os.environ.update(env)
+    sys.path.insert(0, BACKEND_DIR)
+
+    try:
+        ids = prepare_database(args)
+        routes = scenarios(ids)
+        if not ids['search']:
+            routes = [route for route in routes if not route[0].startswith('search')]
+
+        if args.mode == 'client':
+            results, peak_rss_mb = run_client(routes, args)
+        else:
+            results, peak_rss_mb = run_gunicorn(routes, args, env)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'mode': args.mode,
+            'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'workers': args.workers if args.mode != 'client' else None,
+            'concurrency': args.concurrency if args.mode != 'client' else 1,
+            'requests': args.requests,
+            'snapshots': args.snapshots,
+            'dataset': {'projects': args.projects, 'tags': args.tags, 'skills': args.skills,
+                        'contacts': args.contacts, 'images': args.images, 'seed': args.seed},
+        },
+        'peak_rss_mb': peak_rss_mb,
+        'routes': results,
+    }
+    print(f'Peak RSS: {peak_rss_mb} MB')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f'Results written to {args.output}')
+
+
+def compare(args):
+    """Compare two result files; exit 1 if a route regressed beyond the threshold."""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    if baseline['meta']['dataset'] != current['meta']['dataset']:
+        print('Warning: the two runs used a different dataset')
+    if baseline['meta']['mode'] != current['meta']['mode']:
+        # Comparaison voulue entre modes de service (gunicorn WSGI -> asgi)
+        print(f"Mode: {baseline['meta']['mode']} -> {current['meta']['mode']}")
+
+    regressions = 0
+    print(f"{'route':24} {'p50 ms':>18} {'p95 ms':>18} {'req/s':>18}")
+    for name in sorted(set(baseline['routes']) & set(current['routes'])):
+        before, after = baseline['routes'][name], current['routes'][name]
+        cells, regressed = [], False
+        for key, higher_is_worse in (('p50_ms', True), ('p95_ms', True), ('throughput_rps', False)):
+            old, new = before[key], after[key]
+            if not old or new is None:
+                cells.append(f'{new!s:>18}')
+                continue
+            change = (new - old) / old
+            worse = change > args.threshold if higher_is_worse else change < -args.threshold
+            # La p50 suffit à juger : la p95 est trop bruitée sur peu de requêtes
+            regressed |= worse and key != 'p95_ms'
+            cells.append(f"{new:>9} ({change:+.0%}){'!' if worse else ' '}")
+        if after['errors'] > before['errors']:
+            regressed = True
+        regressions += regressed
+        print(f"{name:24} {' '.join(cells)}{'  REGRESSION' if regressed else ''}")
+
+    for name in sorted(set(baseline['routes']) ^ set(current['routes'])):
+        print(f"{name:24} only in {'baseline' if name in baseline['routes'] else 'current'}")
+
+    old_rss, new_rss = baseline.get('peak_rss_mb'), current.get('peak_rss_mb')
+    if old_rss and new_rss:
+        change = (new_rss - old_rss) / old_rss
+        print(f'Peak RSS: {old_rss} -> {new_rss} MB ({change:+.0%})')
+        regressions += change > args.threshold
+
+    if regressions:
+        print(f'{regressions} regression(s) above {args.threshold:.0%}')
+        sys.exit(1)
+    print('No regression')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the API routes.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmark and optionally save the results')
+    run_parser.add_argument('--mode', choices=['client', 'gunicorn', 'asgi'], default='client')
+    run_parser.add_argument('--requests', type=int, default=200, help='requests per read route (writes run fewer)')
+    run_parser.add_argument('--warmup', type=int, default=5)
+    run_parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    run_parser.add_argument('--concurrency', type=int, default=8, help='client threads in gunicorn and asgi modes')
+    run_parser.add_argument('--snapshots', action='store_true', help='serve public routes from snapshots')
+    run_parser.add_argument('--projects', type=int, default=200)
+    run_parser.add_argument('--tags', type=int, default=40)
+    run_parser.add_argument('--skills', type=int, default=40)
+    run_parser.add_argument('--contacts', type=int, default=2000)
+    run_parser.add_argument('--images', type=int, default=10)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--database-uri', help='empty database to use instead of a temporary SQLite file')
+    run_parser.add_argument('--output', help='JSON file for the results (e.g. baseline.json)')
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='allowed relative slowdown')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# cache.py - Cache des réponses des routes publiques
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheBackend:
+    """Interface of a response cache backend.
+
+    Values are opaque bytes. Keys embed the content versions stored in the
+    database (see ContentVersion in app.py), so a version bump makes every
+    entry built from older data unreachable; backends only have to evict.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+
+class LocalCache(CacheBackend):
+    """In-memory LRU cache, private to one worker process.
+
+    Bounded by entry count and, if `max_bytes` is set, by the total size
+    of the values; a value larger than `max_bytes` is not stored.
+    """
+
+    def __init__(self, max_entries=256, ttl=60, max_bytes=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._size += len(value)
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self._size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+
+class SharedCache(CacheBackend):
+    """Cache shared by all workers, stored in a Redis-compatible client.
+
+    The client only needs get() and set(key, value, ex=), so
+    redis.Redis and FakeSharedStore both work. Eviction is left to the
+    store (e.g. maxmemory-policy allkeys-lru).
+    """
+
+    def __init__(self, client, ttl=300, prefix='portfolio:cache:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+
+class FakeSharedStore:
+    """Minimal in-process stand-in for a Redis client (get/set)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+
+def build_cache(kind, ttl, max_entries=256, url=None, prefix='portfolio:cache:', max_bytes=None):
+    """Build a backend by kind (local, shared, fake or none)."""
+    if kind == 'local':
+        return LocalCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes)
+    if kind == 'fake':
+        return SharedCache(FakeSharedStore(), ttl=ttl, prefix=prefix)
+    if kind == 'shared':
+        import redis  # dépendance optionnelle, seulement pour le cache partagé
+        return SharedCache(redis.Redis.from_url(url), ttl=ttl, prefix=prefix)
+    return None
+
+
+def make_cache(config):
+    """Build the backend selected by RESPONSE_CACHE (local, shared, fake or none)."""
+    return build_cache(config.get('RESPONSE_CACHE', 'local'), config.get('RESPONSE_CACHE_TTL', 60),
+                       config.get('RESPONSE_CACHE_MAX_ENTRIES', 256), config.get('RESPONSE_CACHE_URL'),
+                       max_bytes=config.get('RESPONSE_CACHE_MAX_BYTES'))
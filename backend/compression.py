@@ -0,0 +1,53 @@
+# compression.py - Compression HTTP (gzip, brotli) des réponses JSON et choix de l'encodage
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Brotli est optionnel : seulement gzip sans lui
+    brotli = None
+
+# Content-Encoding -> extension du fichier pré-compressé, par ordre de préférence
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# Niveaux pour la compression à la volée : bon ratio sans coûter plus que la sérialisation
+# (les fichiers pré-compressés, eux, utilisent les niveaux maximaux)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def available_encodings():
+    return [encoding for encoding, _ in ENCODINGS if encoding == 'gzip' or brotli is not None]
+
+
+def best_encoding(accept_encodings, encodings=None):
+    """First of `encodings` (default: all available) accepted by the client, or None."""
+    for encoding in encodings if encodings is not None else available_encodings():
+        if accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_chunks(chunks, encoding):
+    """Compress an iterable of byte chunks as one stream, flushing after each chunk.
+
+    The client can decode every chunk as soon as it arrives, so streamed
+    responses stay incremental once compressed.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        # wbits=31 : en-tête et somme de contrôle gzip
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
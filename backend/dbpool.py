@@ -0,0 +1,80 @@
+# dbpool.py - Pool de connexions instrumenté : attente au checkout et saturation
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Checkout counters of this process's connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Fonctions appelées à chaque checkout : observer(wait, timed_out)
+        self.observers = []
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+        for observer in self.observers:
+            observer(wait, timed_out)
+
+    def snapshot(self, pool):
+        """Current pool occupancy plus the checkout counters, as a dict."""
+        with self._lock:
+            counters = {
+                'checkouts': self.checkouts,
+                'checkout_timeouts': self.timeouts,
+                'checkout_wait_seconds_total': round(self.wait_total, 6),
+                'checkout_wait_seconds_max': round(self.wait_max, 6),
+            }
+        if not isinstance(pool, QueuePool):
+            return counters
+
+        # Capacité = pool_size + max_overflow ; saturation 1.0 = les requêtes suivantes attendent
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        return {
+            'size': pool.size(),
+            'capacity': capacity,
+            'checked_out': checked_out,
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'saturation': round(checked_out / capacity, 3) if capacity else None,
+            **counters,
+        }
+
+
+stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited (pre-ping included)."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        stats.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Same instrumentation for the async engine of asgi.py (same counters)."""
@@ -0,0 +1,35 @@
+# gunicorn.conf.py - Chargé automatiquement par `gunicorn app:app` lancé depuis backend/
+import os
+import sys
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+# Chaque worker ouvre au plus DB_POOL_SIZE + DB_MAX_OVERFLOW connexions à la base
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+# Import de l'application une seule fois dans le master, puis fork des workers
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() in ('true', '1', 't')
+
+# SERVER_MODE=asgi : workers uvicorn servant asgi:app (lectures et contact en asynchrone)
+if os.environ.get('SERVER_MODE', 'wsgi').lower() == 'asgi':
+    wsgi_app = 'asgi:app'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+
+# Métriques Prometheus multiprocess : on repart d'un dossier vide. Fait au chargement de
+# cette configuration, donc avant l'import de l'application par preload_app
+_metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if _metrics_dir:
+    os.makedirs(_metrics_dir, exist_ok=True)
+    for _name in os.listdir(_metrics_dir):
+        os.remove(os.path.join(_metrics_dir, _name))
+
+
+def post_fork(server, worker):
+    # Avec preload_app, le module est déjà importé : pool et threads hérités du master à réinitialiser
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.after_fork()
+
+
+def child_exit(server, worker):
+    import metrics
+    metrics.mark_process_dead(worker.pid)
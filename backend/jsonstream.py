@@ -0,0 +1,36 @@
+# jsonstream.py - Encodage JSON rapide et tableaux JSON produits par morceaux
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : json de la bibliothèque standard sinon
+    orjson = None
+
+# Taille visée des morceaux envoyés au client (un write socket par morceau)
+CHUNK_SIZE = 64 * 1024
+
+
+def dumps(value):
+    """Compact JSON as bytes, keys sorted like Flask's jsonify."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(value, separators=(',', ':'), sort_keys=True).encode()
+
+
+def array_chunks(items, serialize, chunk_size=CHUNK_SIZE):
+    """Yield a JSON array of serialize(item) as byte chunks of about `chunk_size`.
+
+    Only one chunk is held in memory at a time, whatever the number of items.
+    The trailing newline matches jsonify's output.
+    """
+    buffer = bytearray(b'[')
+    separator = b''
+    for item in items:
+        buffer += separator
+        buffer += dumps(serialize(item))
+        separator = b','
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b']\n'
+    yield bytes(buffer)
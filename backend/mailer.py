@@ -0,0 +1,80 @@
+# mailer.py - Connexion SMTP réutilisable pour l'envoi par lots
+import smtplib
+
+
+class ConnectionFailed(Exception):
+    """The SMTP server could not be reached or dropped the connection.
+
+    Unlike a rejected message (smtplib.SMTPResponseException), the next
+    messages would fail the same way.
+    """
+
+
+class SMTPConnection:
+    """One authenticated SMTP session reused for several messages.
+
+    The connection (and STARTTLS/login) is opened by open() or on the first
+    send. If the server drops it, the next send reconnects.
+    """
+
+    def __init__(self, server, port, use_tls=True, username=None, password=None, timeout=30):
+        self.server = server
+        self.port = port
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._smtp = None
+
+    def open(self):
+        """Connect (and log in) if not connected yet; raises ConnectionFailed."""
+        if self._smtp is not None:
+            return
+        try:
+            smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        except OSError as e:
+            raise ConnectionFailed(str(e)) from e
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except OSError as e:
+            smtp.close()
+            raise ConnectionFailed(str(e)) from e
+        except BaseException:
+            smtp.close()
+            raise
+        self._smtp = smtp
+
+    def send(self, msg):
+        """Send one message; raises ConnectionFailed, or SMTPResponseException if it is refused."""
+        self.open()
+        try:
+            self._smtp.send_message(msg)
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+            if self._smtp.sock is None:
+                # 421 : smtplib a fermé la connexion, le serveur n'acceptera plus rien
+                self.close()
+                raise ConnectionFailed(str(e)) from e
+            # Message refusé par le serveur : la connexion reste utilisable
+            raise
+        except (smtplib.SMTPServerDisconnected, OSError) as e:
+            # Connexion perdue : on la rouvrira au prochain envoi
+            self.close()
+            raise ConnectionFailed(str(e)) from e
+
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
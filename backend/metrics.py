@@ -0,0 +1,118 @@
+# metrics.py - Métriques Prometheus de l'API (requêtes, SQL, SMTP, caches, pool, limiteurs)
+#
+# Avec gunicorn, définir PROMETHEUS_MULTIPROC_DIR (voir gunicorn.conf.py) avant
+# l'import : chaque worker écrit ses valeurs dans ce dossier et /metrics les agrège.
+import os
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:  # prometheus_client est optionnel : sans lui, rien n'est mesuré
+    prometheus_client = None
+
+ENABLED = prometheus_client is not None
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+if ENABLED:
+    REQUESTS = Counter('http_requests_total', 'HTTP requests handled',
+                       ['method', 'endpoint', 'status'])
+    REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Time spent handling a request',
+                                 ['method', 'endpoint'])
+    RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Size of the response body',
+                              ['endpoint'], buckets=SIZE_BUCKETS)
+
+    REQUEST_QUERIES = Histogram('http_request_db_queries', 'SQL statements executed per request',
+                                ['endpoint'], buckets=QUERY_COUNT_BUCKETS)
+    REQUEST_DB_TIME = Histogram('http_request_db_seconds', 'Time spent in SQL per request',
+                                ['endpoint'], buckets=SQL_BUCKETS)
+    QUERY_DURATION = Histogram('db_query_duration_seconds', 'Duration of one SQL statement',
+                               buckets=SQL_BUCKETS)
+
+    SMTP_DURATION = Histogram('smtp_send_duration_seconds', 'Time spent sending one email',
+                              ['outcome'])
+
+    CACHE_LOOKUPS = Counter('cache_lookups_total', 'Cache lookups by layer and result',
+                            ['cache', 'result'])
+    RATE_LIMITED = Counter('rate_limited_total', 'Requests refused by a rate limiter',
+                           ['limiter'])
+    CONTACT_DROPPED = Counter('contact_dropped_total', 'Contact submissions answered but not stored',
+                              ['reason'])
+
+    POOL_CHECKOUT = Histogram('db_pool_checkout_seconds', 'Wait for a connection from the pool',
+                              buckets=SQL_BUCKETS)
+    POOL_TIMEOUTS = Counter('db_pool_checkout_timeouts_total', 'Checkouts that hit pool_timeout')
+    # livesum : somme sur les workers vivants uniquement
+    POOL_CHECKED_OUT = Gauge('db_pool_checked_out', 'Connections in use',
+                             multiprocess_mode='livesum')
+    POOL_CAPACITY = Gauge('db_pool_capacity', 'pool_size + max_overflow',
+                          multiprocess_mode='livesum')
+
+
+def observe_request(method, endpoint, status, duration, size, queries, db_seconds):
+    if not ENABLED:
+        return
+    REQUESTS.labels(method, endpoint, str(status)).inc()
+    REQUEST_DURATION.labels(method, endpoint).observe(duration)
+    if size is not None:
+        RESPONSE_SIZE.labels(endpoint).observe(size)
+    REQUEST_QUERIES.labels(endpoint).observe(queries)
+    REQUEST_DB_TIME.labels(endpoint).observe(db_seconds)
+
+
+def observe_query(duration):
+    if ENABLED:
+        QUERY_DURATION.observe(duration)
+
+
+def observe_smtp(duration, ok):
+    if ENABLED:
+        SMTP_DURATION.labels('sent' if ok else 'error').observe(duration)
+
+
+def observe_cache(cache, hit):
+    if ENABLED:
+        CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def observe_rate_limited(limiter):
+    if ENABLED:
+        RATE_LIMITED.labels(limiter).inc()
+
+
+def observe_contact_dropped(reason):
+    if ENABLED:
+        CONTACT_DROPPED.labels(reason).inc()
+
+
+def observe_pool_checkout(wait, timed_out=False):
+    if not ENABLED:
+        return
+    if timed_out:
+        POOL_TIMEOUTS.inc()
+    else:
+        POOL_CHECKOUT.observe(wait)
+
+
+def set_pool_usage(checked_out, capacity):
+    if ENABLED:
+        POOL_CHECKED_OUT.set(checked_out)
+        POOL_CAPACITY.set(capacity)
+
+
+def mark_process_dead(pid):
+    """Drop the live gauges of a worker that exited (gunicorn child_exit)."""
+    if ENABLED and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+def render():
+    """Return (body, content type) in the Prometheus text format."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
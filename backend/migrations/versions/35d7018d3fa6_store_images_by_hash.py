@@ -0,0 +1,118 @@
+"""Store project images by hash
+
+Revision ID: 35d7018d3fa6
+Revises: 6457b1f5ff56
+Create Date: 2026-10-17 10:12:04.118402
+
+"""
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+
+# revision identifiers, used by Alembic.
+revision = '35d7018d3fa6'
+down_revision = '6457b1f5ff56'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.env')
+
+DATA_URI_RE = re.compile(r'^data:[^,]*;base64,', re.IGNORECASE)
+# Images de plusieurs Mo en base64 : seulement quelques lignes en mémoire à la fois
+BATCH_SIZE = 20
+
+projects = sa.table('projects',
+    sa.column('id', sa.Integer),
+    sa.column('image', sa.Text),
+    sa.column('image_hash', sa.String(64))
+)
+
+
+def _mimetype(data):
+    if data.startswith(b'\x89PNG'):
+        return 'image/png'
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data.startswith(b'GIF8'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'image/svg+xml'
+
+
+def _blob_path(root, digest):
+    return os.path.join(root, digest[:2], digest[2:4], digest)
+
+
+def upgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_hash', sa.String(length=64), nullable=True))
+
+    # Backfill : les data URIs base64 existants sont écrits sur disque
+    root = current_app.config['UPLOAD_FOLDER']
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(projects.c.id, projects.c.image)
+            .where(projects.c.image.like('data:%'), projects.c.id > last_id)
+            .order_by(projects.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        for project_id, image in rows:
+            _store_image(conn, root, project_id, image)
+
+
+def _store_image(conn, root, project_id, image):
+    match = DATA_URI_RE.match(image)
+    if not match:
+        return
+    try:
+        data = base64.b64decode(image[match.end():], validate=True)
+    except (binascii.Error, ValueError):
+        # Ligne laissée telle quelle (toujours servie en data URI) plutôt que d'annuler la migration
+        logger.warning('Project %s: invalid base64 image data, left in place', project_id)
+        return
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(root, digest)
+    if not os.path.isfile(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+    conn.execute(
+        projects.update().where(projects.c.id == project_id).values(image=None, image_hash=digest)
+    )
+
+
+def downgrade():
+    # Réintègre les images en base64 avant de supprimer la colonne
+    root = current_app.config['UPLOAD_FOLDER']
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(projects.c.id, projects.c.image_hash).where(projects.c.image_hash.isnot(None))
+    ).fetchall()
+    for project_id, digest in rows:
+        path = _blob_path(root, digest)
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        image = 'data:' + _mimetype(data) + ';base64,' + base64.b64encode(data).decode('ascii')
+        conn.execute(
+            projects.update().where(projects.c.id == project_id).values(image=image)
+        )
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('image_hash')
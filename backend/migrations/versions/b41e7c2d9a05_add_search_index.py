@@ -0,0 +1,71 @@
+"""Add search index
+
+Revision ID: b41e7c2d9a05
+Revises: 8d2f4b7a91c3
+Create Date: 2026-10-17 15:47:12.094381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41e7c2d9a05'
+down_revision = '8d2f4b7a91c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables écrites à la main : tsvector + GIN sous PostgreSQL, FTS5 sous SQLite
+    # (même schéma que search.py, qui les crée aussi après db.create_all())
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for kind in ('projects', 'contacts'):
+            op.execute(f'CREATE TABLE search_{kind} ('
+                       f'id INTEGER PRIMARY KEY REFERENCES {kind} (id) ON DELETE CASCADE, '
+                       f'document TSVECTOR NOT NULL)')
+            op.execute(f'CREATE INDEX ix_search_{kind}_document ON search_{kind} USING GIN (document)')
+
+        op.execute("""
+            INSERT INTO search_projects (id, document)
+            SELECT p.id,
+                   setweight(to_tsvector('simple', coalesce(p.title, '')), 'A') ||
+                   setweight(to_tsvector('simple', coalesce(string_agg(t.name, ' '), '')), 'B') ||
+                   setweight(to_tsvector('simple', coalesce(p.description, '')), 'C')
+            FROM projects p
+            LEFT JOIN project_tags pt ON pt.project_id = p.id
+            LEFT JOIN tags t ON t.id = pt.tag_id
+            GROUP BY p.id
+        """)
+        op.execute("""
+            INSERT INTO search_contacts (id, document)
+            SELECT id,
+                   setweight(to_tsvector('simple', subject), 'A') ||
+                   setweight(to_tsvector('simple', name || ' ' || email), 'B') ||
+                   setweight(to_tsvector('simple', message), 'C')
+            FROM contacts
+        """)
+    elif dialect == 'sqlite':
+        for kind in ('projects', 'contacts'):
+            op.execute(f'CREATE VIRTUAL TABLE search_{kind} USING fts5('
+                       f"title, keywords, body, tokenize = 'unicode61 remove_diacritics 2')")
+
+        op.execute("""
+            INSERT INTO search_projects (rowid, title, keywords, body)
+            SELECT p.id, p.title, coalesce(group_concat(t.name, ' '), ''), p.description
+            FROM projects p
+            LEFT JOIN project_tags pt ON pt.project_id = p.id
+            LEFT JOIN tags t ON t.id = pt.tag_id
+            GROUP BY p.id
+        """)
+        op.execute("""
+            INSERT INTO search_contacts (rowid, title, keywords, body)
+            SELECT id, subject, name || ' ' || email, message
+            FROM contacts
+        """)
+
+
+def downgrade():
+    op.execute('DROP TABLE IF EXISTS search_contacts')
+    op.execute('DROP TABLE IF EXISTS search_projects')
@@ -0,0 +1,37 @@
+"""Add content versions
+
+Revision ID: cc86537854a9
+Revises: 35d7018d3fa6
+Create Date: 2026-10-17 11:40:27.603118
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cc86537854a9'
+down_revision = '35d7018d3fa6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    content_versions = op.create_table('content_versions',
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    now = datetime.utcnow().replace(microsecond=0)
+    op.bulk_insert(content_versions, [
+        {'name': name, 'version': 1, 'updated_at': now}
+        for name in ('projects', 'tags', 'skills')
+    ])
+
+
+def downgrade():
+    op.drop_table('content_versions')
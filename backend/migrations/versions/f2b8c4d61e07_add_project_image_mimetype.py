@@ -0,0 +1,65 @@
+"""Add project image mimetype
+
+Revision ID: f2b8c4d61e07
+Revises: d7a3e5f19b62
+Create Date: 2026-10-17 21:14:52.604318
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8c4d61e07'
+down_revision = 'd7a3e5f19b62'
+branch_labels = None
+depends_on = None
+
+projects = sa.table('projects',
+    sa.column('image_hash', sa.String(64)),
+    sa.column('image_mimetype', sa.String(50))
+)
+
+
+def _mimetype(head):
+    if head.startswith(b'\x89PNG'):
+        return 'image/png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'GIF8'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    stripped = head.lstrip()
+    if stripped.startswith(b'<svg') or stripped.startswith(b'<?xml'):
+        return 'image/svg+xml'
+    return None
+
+
+def upgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_mimetype', sa.String(length=50), nullable=True))
+
+    # Backfill depuis les premiers octets de chaque fichier (une lecture par image distincte)
+    root = current_app.config['UPLOAD_FOLDER']
+    conn = op.get_bind()
+    hashes = conn.execute(
+        sa.select(projects.c.image_hash).where(projects.c.image_hash.isnot(None)).distinct()
+    ).scalars().all()
+    for digest in hashes:
+        path = os.path.join(root, digest[:2], digest[2:4], digest)
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            mimetype = _mimetype(f.read(64))
+        conn.execute(
+            projects.update().where(projects.c.image_hash == digest).values(image_mimetype=mimetype)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('image_mimetype')
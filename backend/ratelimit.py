@@ -0,0 +1,243 @@
+# ratelimit.py - Limiteurs de débit pour les routes coûteuses (/api/login, /api/contact)
+#
+# Seau à jetons (login) : chaque clé (IP, nom d'utilisateur) a un seau de
+# `capacity` jetons, rempli à `rate` jetons par seconde. Une tentative prend un
+# jeton ; seau vide = refus, avec le délai avant le prochain jeton (Retry-After).
+#
+# Fenêtre glissante (contact) : au plus `limit` envois par `window` secondes.
+# Le compteur de la fenêtre fixe précédente est pondéré par la part de celle-ci
+# encore couverte par la fenêtre glissante : deux entiers par clé.
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# Même algorithme que refill(), exécuté atomiquement dans Redis
+TOKEN_BUCKET_SCRIPT = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local rate, capacity, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local allowed, retry_after = 0, 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+# Même algorithme que slide(), exécuté atomiquement dans Redis
+SLIDING_WINDOW_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'index', 'current', 'previous')
+local limit, window, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local index = math.floor(now / window)
+local current, previous = tonumber(state[2]) or 0, tonumber(state[3]) or 0
+if tonumber(state[1]) ~= index then
+    if tonumber(state[1]) == index - 1 then previous = current else previous = 0 end
+    current = 0
+end
+local elapsed = now / window - index
+local allowed, retry_after = 0, 0
+if previous * (1 - elapsed) + current < limit then
+    current = current + 1
+    allowed = 1
+elseif current < limit then
+    retry_after = window * (1 - (limit - current) / previous - elapsed)
+else
+    retry_after = window * (2 - elapsed - limit / current)
+end
+redis.call('HSET', KEYS[1], 'index', index, 'current', current, 'previous', previous)
+redis.call('PEXPIRE', KEYS[1], math.ceil(2 * window * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+def refill(tokens, updated_at, now, rate, capacity):
+    """Take one token from a bucket; return (tokens left, allowed, seconds before the next token)."""
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, True, 0.0
+    return tokens, False, (1 - tokens) / rate
+
+
+def slide(state, now, limit, window):
+    """Count one attempt in a sliding window.
+
+    `state` is (window index, count in that window, count in the previous
+    one) or None; returns (new state, allowed, seconds before an attempt
+    is allowed again). Refused attempts are not counted.
+    """
+    index = int(now // window)
+    stored_index, current, previous = state or (index, 0, 0)
+    if stored_index != index:
+        previous = current if stored_index == index - 1 else 0
+        current = 0
+    elapsed = now / window - index
+    if previous * (1 - elapsed) + current < limit:
+        return (index, current + 1, previous), True, 0.0
+    if current < limit:
+        # La part pondérée de la fenêtre précédente doit encore décroître
+        retry_after = window * (1 - (limit - current) / previous - elapsed)
+    else:
+        # Attendre la fenêtre suivante, où `current` devient la part pondérée
+        retry_after = window * (2 - elapsed - limit / current)
+    return (index, current, previous), False, retry_after
+
+
+class RateLimiter:
+    """Interface of a rate limiter backend."""
+
+    def take(self, key):
+        """Consume one attempt for `key`; return (allowed, retry_after seconds)."""
+        raise NotImplementedError
+
+
+class LocalTokenBucket(RateLimiter):
+    """Token buckets in memory, private to one worker process.
+
+    With N workers a client gets up to N times the configured rate. The
+    least recently used buckets are dropped beyond `max_entries`, so
+    rotating keys cannot grow the process memory.
+    """
+
+    def __init__(self, rate, capacity, max_entries=10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+            tokens, allowed, retry_after = refill(tokens, updated_at, now, self.rate, self.capacity)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class SharedTokenBucket(RateLimiter):
+    """Token buckets shared by all workers, stored in a Redis-compatible client.
+
+    The client only needs register_script(), so redis.Redis and
+    FakeLimiterStore both work. Buckets expire once they would be full again.
+    """
+
+    def __init__(self, client, rate, capacity, prefix='portfolio:ratelimit:'):
+        self.rate = rate
+        self.capacity = capacity
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key):
+        # Horloge murale : partagée entre les workers, contrairement à time.monotonic()
+        allowed, retry_after = self._script(keys=[self.prefix + key],
+                                            args=[self.rate, self.capacity, time.time()])
+        return bool(int(allowed)), float(retry_after)
+
+
+class LocalSlidingWindow(RateLimiter):
+    """Sliding-window counters in memory, private to one worker process (LRU-bounded)."""
+
+    def __init__(self, limit, window, max_entries=10000):
+        self.limit = limit
+        self.window = window
+        self.max_entries = max_entries
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        now = time.monotonic()
+        with self._lock:
+            state, allowed, retry_after = slide(self._windows.get(key), now, self.limit, self.window)
+            self._windows[key] = state
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_entries:
+                self._windows.popitem(last=False)
+        return allowed, retry_after
+
+
+class SharedSlidingWindow(RateLimiter):
+    """Sliding-window counters shared by all workers, like SharedTokenBucket."""
+
+    def __init__(self, client, limit, window, prefix='portfolio:ratelimit:'):
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def take(self, key):
+        allowed, retry_after = self._script(keys=[self.prefix + key],
+                                            args=[self.limit, self.window, time.time()])
+        return bool(int(allowed)), float(retry_after)
+
+
+class FakeLimiterStore:
+    """Minimal in-process stand-in for a Redis client running the limiter scripts.
+
+    Each script is replaced by its Python twin (refill, slide).
+    """
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def register_script(self, source):
+        scripts = {TOKEN_BUCKET_SCRIPT: self._token_bucket, SLIDING_WINDOW_SCRIPT: self._sliding_window}
+        if source not in scripts:
+            raise ValueError('FakeLimiterStore only runs the scripts of ratelimit.py')
+        return scripts[source]
+
+    def _token_bucket(self, keys, args):
+        (key,), (rate, capacity, now) = keys, args
+        with self._lock:
+            tokens, updated_at = self._states.get(key, (capacity, now))
+            tokens, allowed, retry_after = refill(tokens, updated_at, now, rate, capacity)
+            self._states[key] = (tokens, now)
+        return [int(allowed), str(retry_after)]
+
+    def _sliding_window(self, keys, args):
+        (key,), (limit, window, now) = keys, args
+        with self._lock:
+            state, allowed, retry_after = slide(self._states.get(key), now, limit, window)
+            self._states[key] = state
+        return [int(allowed), str(retry_after)]
+
+
+def retry_after_header(seconds):
+    # Retry-After n'accepte que des secondes entières
+    return str(max(1, math.ceil(seconds)))
+
+
+def shared_client(kind, url):
+    if kind == 'fake':
+        return FakeLimiterStore()
+    import redis  # dépendance optionnelle, seulement pour les limiteurs partagés
+    return redis.Redis.from_url(url)
+
+
+def make_limiter(kind, per_minute, capacity, url=None, prefix='portfolio:ratelimit:'):
+    """Build the token bucket backend selected by `kind` (local, shared, fake or none)."""
+    rate = per_minute / 60
+    if kind == 'local':
+        return LocalTokenBucket(rate, capacity)
+    if kind in ('shared', 'fake'):
+        return SharedTokenBucket(shared_client(kind, url), rate, capacity, prefix)
+    return None
+
+
+def make_sliding_window(kind, limit, window, url=None, prefix='portfolio:ratelimit:'):
+    """Build the sliding window backend selected by `kind` (local, shared, fake or none)."""
+    if kind == 'local':
+        return LocalSlidingWindow(limit, window)
+    if kind in ('shared', 'fake'):
+        return SharedSlidingWindow(shared_client(kind, url), limit, window, prefix)
+    return None
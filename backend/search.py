@@ -0,0 +1,129 @@
+# search.py - Index plein texte : tsvector + GIN sous PostgreSQL, FTS5 sous SQLite
+import re
+
+from sqlalchemy import text
+
+# Type de document -> table d'index (une ligne par projet / message, même id)
+TABLES = {'projects': 'search_projects', 'contacts': 'search_contacts'}
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TERMS = 8
+
+
+def parse_terms(query):
+    """Split a user query into lowercase word terms (punctuation is dropped)."""
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def _parameters(documents):
+    return [
+        {'id': doc_id, 'title': title or '', 'keywords': ' '.join(keywords), 'body': body or ''}
+        for doc_id, title, keywords, body in documents
+    ]
+
+
+class SearchBackend:
+    """Interface of a full-text index.
+
+    Each document has a title, a list of keywords (tag names) and a body,
+    weighted in that order. Methods take a SQLAlchemy connection or session,
+    so index writes join the caller's transaction.
+    """
+
+    def create(self, conn):
+        raise NotImplementedError
+
+    def drop(self, conn):
+        for table in TABLES.values():
+            conn.execute(text(f'DROP TABLE IF EXISTS {table}'))
+
+    def upsert(self, conn, kind, doc_id, title, keywords, body):
+        self.upsert_many(conn, kind, [(doc_id, title, keywords, body)])
+
+    def upsert_many(self, conn, kind, documents):
+        """Write (id, title, keywords, body) documents with one executemany."""
+        raise NotImplementedError
+
+    def delete(self, conn, kind, doc_id):
+        raise NotImplementedError
+
+    def search(self, conn, kind, terms, limit):
+        """Return the ids of the best matching documents, best first."""
+        raise NotImplementedError
+
+
+class PostgresSearch(SearchBackend):
+    # Configuration 'simple' : pas de racinisation, le contenu mélange français et anglais
+    DOCUMENT = ("setweight(to_tsvector('simple', :title), 'A') || "
+                "setweight(to_tsvector('simple', :keywords), 'B') || "
+                "setweight(to_tsvector('simple', :body), 'C')")
+
+    def create(self, conn):
+        for kind, table in TABLES.items():
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS {table} ('
+                f'id INTEGER PRIMARY KEY REFERENCES {kind} (id) ON DELETE CASCADE, '
+                f'document TSVECTOR NOT NULL)'
+            ))
+            conn.execute(text(f'CREATE INDEX IF NOT EXISTS ix_{table}_document ON {table} USING GIN (document)'))
+
+    def upsert_many(self, conn, kind, documents):
+        conn.execute(text(
+            f'INSERT INTO {TABLES[kind]} (id, document) VALUES (:id, {self.DOCUMENT}) '
+            f'ON CONFLICT (id) DO UPDATE SET document = excluded.document'
+        ), _parameters(documents))
+
+    def delete(self, conn, kind, doc_id):
+        conn.execute(text(f'DELETE FROM {TABLES[kind]} WHERE id = :id'), {'id': doc_id})
+
+    def search(self, conn, kind, terms, limit):
+        if not terms:
+            return []
+        # Chaque terme est un préfixe et tous doivent être présents
+        query = ' & '.join(term + ':*' for term in terms)
+        rows = conn.execute(text(
+            f"SELECT id FROM {TABLES[kind]}, to_tsquery('simple', :query) AS query "
+            f'WHERE document @@ query ORDER BY ts_rank(document, query) DESC, id DESC LIMIT :limit'
+        ), {'query': query, 'limit': limit})
+        return [row[0] for row in rows]
+
+
+class SqliteSearch(SearchBackend):
+    def create(self, conn):
+        # rowid = id du projet / message ; le contenu n'est pas dupliqué ailleurs
+        for table in TABLES.values():
+            conn.execute(text(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5('
+                f"title, keywords, body, tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+
+    def upsert_many(self, conn, kind, documents):
+        table = TABLES[kind]
+        parameters = _parameters(documents)
+        conn.execute(text(f'DELETE FROM {table} WHERE rowid = :id'), parameters)
+        conn.execute(text(
+            f'INSERT INTO {table} (rowid, title, keywords, body) VALUES (:id, :title, :keywords, :body)'
+        ), parameters)
+
+    def delete(self, conn, kind, doc_id):
+        conn.execute(text(f'DELETE FROM {TABLES[kind]} WHERE rowid = :id'), {'id': doc_id})
+
+    def search(self, conn, kind, terms, limit):
+        if not terms:
+            return []
+        table = TABLES[kind]
+        # Termes entre guillemets : aucun n'est interprété comme opérateur FTS5
+        query = ' '.join(f'"{term}"*' for term in terms)
+        rows = conn.execute(text(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH :query '
+            f'ORDER BY bm25({table}, 10.0, 5.0, 1.0), rowid DESC LIMIT :limit'
+        ), {'query': query, 'limit': limit})
+        return [row[0] for row in rows]
+
+
+BACKENDS = {'postgresql': PostgresSearch(), 'sqlite': SqliteSearch()}
+
+
+def backend_for(dialect_name):
+    """Return the index backend for a SQLAlchemy dialect name, or None if unsupported."""
+    return BACKENDS.get(dialect_name)
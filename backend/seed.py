@@ -1,8 +1,15 @@
 #!/usr/bin/env python
 # seed.py - Script to populate the database with initial data
 
-from app import app, db, User, Project, Tag, Skill
+import argparse
+import base64
+import io
+import random
+
+from app import (app, db, User, Project, Tag, Skill, Contact, bump_content_version, refresh_snapshots,
+                 rebuild_search_index, validate_project_record, insert_projects, insert_skills, search_backend)
 from werkzeug.security import generate_password_hash
+import storage
 
 def seed_database():
     print("Starting database seeding...")
@@ -174,11 +181,109 @@ def seed_database():
         )
         db.session.add(skill)
     
+    # Nouvelle version du contenu public (ETags et cache des réponses)
+    bump_content_version('projects', 'tags', 'skills')
     db.session.commit()
     print(f"Created {len(skills_data)} skills")
     
+    # Index de recherche reconstruit à partir des projets insérés
+    rebuild_search_index()
+    
+    # Snapshots publics (nécessite SNAPSHOT_BASE_URL hors requête)
+    refresh_snapshots()
+    
     print("Database seeding completed successfully!")
 
+# Générateur de données volumineuses (benchmarks) : insertion par lots, comme l'import NDJSON
+WORDS = (
+    'api application cache client data design dashboard deploy docker flask frontend graph '
+    'interface javascript mobile node platform python react realtime search server stripe '
+    'tailwind task typescript user web workflow analytics payment portfolio tracker'
+).split()
+CATEGORIES = ['frontend', 'backend', 'tools', 'design']
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+def generate_images(rng, count, width=1260, height=750):
+    """Return `count` distinct JPEG data URIs of photo-like size (noise compresses badly)."""
+    if storage.Image is None:
+        print("Pillow is not installed, projects are generated without images")
+        return []
+    uris = []
+    for _ in range(count):
+        buffer = io.BytesIO()
+        # Pixels tirés du générateur seedé : mêmes images (et mêmes hash) à chaque génération
+        noise = storage.Image.frombytes('L', (width, height), rng.randbytes(width * height))
+        noise.convert('RGB').save(buffer, 'JPEG', quality=80)
+        uris.append('data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii'))
+    return uris
+
+def generate_data(projects=100, tags=30, skills=40, contacts=1000, images=10, seed=0, batch_size=500):
+    """Append a synthetic dataset of the given size; reproducible for a given seed."""
+    rng = random.Random(seed)
+    tag_names = [f'{rng.choice(WORDS).capitalize()} {i}' for i in range(tags)]
+    image_uris = generate_images(rng, images)
+    
+    batch = []
+    for i in range(projects):
+        batch.append(validate_project_record({
+            'title': sentence(rng, 3)[:90] + f' {i}',
+            'description': ' '.join(sentence(rng, 12) + '.' for _ in range(rng.randint(2, 8))),
+            'image': image_uris[i % len(image_uris)] if image_uris else None,
+            'demoUrl': f'https://example.com/demo/{i}',
+            'repoUrl': f'https://example.com/repo/{i}',
+            'featured': rng.random() < 0.1,
+            'tags': rng.sample(tag_names, min(len(tag_names), rng.randint(1, 5))),
+        }))
+        if len(batch) == batch_size or i == projects - 1:
+            insert_projects(batch)
+            db.session.commit()
+            batch = []
+    print(f"Generated {projects} projects ({len(image_uris)} distinct images, {tags} tags)")
+    
+    insert_skills([
+        {'name': f'{rng.choice(WORDS).capitalize()} {i}', 'level': rng.randint(20, 100),
+         'category': rng.choice(CATEGORIES)}
+        for i in range(skills)
+    ])
+    db.session.commit()
+    print(f"Generated {skills} skills")
+    
+    backend = search_backend()
+    for start in range(0, contacts, batch_size):
+        rows = [
+            {'name': f'Visitor {i}', 'email': f'visitor{i}@example.com', 'subject': sentence(rng, 5),
+             'message': ' '.join(sentence(rng, 15) + '.' for _ in range(rng.randint(1, 6))),
+             'read': rng.random() < 0.7}
+            for i in range(start, min(start + batch_size, contacts))
+        ]
+        ids = db.session.execute(
+            db.insert(Contact).returning(Contact.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        if backend is not None:
+            backend.upsert_many(db.session, 'contacts', [
+                (contact_id, row['subject'], [row['name'], row['email']], row['message'])
+                for contact_id, row in zip(ids, rows)
+            ])
+        db.session.commit()
+    print(f"Generated {contacts} contacts")
+    
+    refresh_snapshots()
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Seed the database, or append a generated dataset.')
+    parser.add_argument('--generate', action='store_true', help='append synthetic data instead of the demo content')
+    parser.add_argument('--projects', type=int, default=100)
+    parser.add_argument('--tags', type=int, default=30)
+    parser.add_argument('--skills', type=int, default=40)
+    parser.add_argument('--contacts', type=int, default=1000)
+    parser.add_argument('--images', type=int, default=10, help='distinct images shared by the projects')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
     with app.app_context():
-        seed_database()
\ No newline at end of file
+        if args.generate:
+            generate_data(args.projects, args.tags, args.skills, args.contacts, args.images, args.seed)
+        else:
+            seed_database()
\ No newline at end of file
@@ -0,0 +1,79 @@
+# serializers.py - Sérialiseurs ligne -> dict compilés une fois par modèle et par vue
+#
+# Un schéma décrit les champs exposés d'un modèle : expressions SQL lues et
+# conversion éventuelle. compile() génère le code d'une fonction qui construit
+# le dict directement depuis les positions de la Row d'un select Core, sans
+# objet ORM ni boucle sur les champs :
+#
+#   def to_dict(row):
+#       return {'id': row[0], 'image': convert_1(row[1], row[2]), ...}
+from functools import lru_cache
+
+from sqlalchemy import select
+
+
+class Field:
+    """An output key: the SQL expressions it reads and an optional conversion.
+
+    Without `convert` the field must read exactly one expression, returned
+    as is. `key` renames the output key (defaults to the field name).
+    """
+
+    def __init__(self, *columns, convert=None, key=None):
+        if convert is None and len(columns) != 1:
+            raise ValueError('A field without convert reads exactly one column')
+        self.columns = columns
+        self.convert = convert
+        self.key = key
+
+
+class Serializer:
+    """Row -> dict function for a fixed list of fields, plus the columns to SELECT."""
+
+    def __init__(self, fields):
+        self.fields = [name for name, _ in fields]
+        self.columns = []
+        positions = {}
+        namespace = {}
+        items = []
+        for index, (name, field) in enumerate(fields):
+            arguments = []
+            for column in field.columns:
+                # Une colonne lue par plusieurs champs (image_hash) n'est sélectionnée qu'une fois
+                if id(column) not in positions:
+                    positions[id(column)] = len(self.columns)
+                    self.columns.append(column)
+                arguments.append(f'row[{positions[id(column)]}]')
+            if field.convert is None:
+                value = arguments[0]
+            else:
+                namespace[f'convert_{index}'] = field.convert
+                value = f"convert_{index}({', '.join(arguments)})"
+            items.append(f'{field.key or name!r}: {value}')
+
+        source = f"def to_dict(row):\n    return {{{', '.join(items)}}}\n"
+        exec(compile(source, f"<serializer {','.join(self.fields)}>", 'exec'), namespace)
+        self.to_dict = namespace['to_dict']
+
+    def select(self):
+        """A SELECT of exactly the columns `to_dict` reads, in Row order."""
+        return select(*self.columns)
+
+
+class Schema:
+    """Fields of one model, by name; compiled views are cached."""
+
+    def __init__(self, **fields):
+        self.fields = fields
+        # Les combinaisons de ?fields= sont choisies par le client : cache borné
+        self._compile = lru_cache(maxsize=64)(self._build)
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def compile(self, names=None):
+        """Serializer for `names` (all fields, in declaration order, by default)."""
+        return self._compile(tuple(self.fields if names is None else names))
+
+    def _build(self, names):
+        return Serializer([(name, self.fields[name]) for name in names])
@@ -0,0 +1,163 @@
+# snapshots.py - Réponses JSON pré-générées et pré-compressées des routes publiques
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows : seul le verrou entre threads s'applique (serveur de développement)
+    fcntl = None
+
+from compression import ENCODINGS, available_encodings, best_encoding, brotli
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+LOCK = '.lock'
+
+_lock = threading.Lock()
+
+
+def compress(data):
+    """Return {encoding: bytes} for every content-coding available here."""
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return variants
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+@contextmanager
+def locked(folder):
+    """Serialize the writers of `folder`, across threads and worker processes."""
+    os.makedirs(folder, exist_ok=True)
+    with _lock, open(os.path.join(folder, LOCK), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def is_older(versions, previous):
+    """True if `versions` ({table: version}) predates the `previous` manifest."""
+    return any(versions.get(name, 0) < version for name, version in previous.get('versions', {}).items())
+
+
+def write_snapshots(folder, entries, base_url, versions):
+    """Write a new generation of snapshot files and switch the manifest to it.
+
+    `entries` maps a request key (path + sorted query string) to a dict with
+    'name', 'etag', 'last_modified' and 'body'; `versions` are the content
+    versions ({table: version}) they were rendered from. Each generation
+    lives in its own directory, so readers never see a mix of old and new
+    files; the manifest is replaced atomically last. Returns False, without
+    touching the manifest, if it already holds newer versions.
+    """
+    with locked(folder):
+        previous = read_manifest(folder)
+        if previous and is_older(versions, previous):
+            return False
+        _write_generation(folder, entries, base_url, versions, previous)
+    return True
+
+
+def _write_generation(folder, entries, base_url, versions, previous):
+    generation = uuid.uuid4().hex
+    directory = os.path.join(folder, generation)
+    os.makedirs(directory)
+
+    for entry in entries.values():
+        path = os.path.join(directory, entry['name'] + '.json')
+        _write(path, entry['body'])
+        for encoding, data in compress(entry['body']).items():
+            _write(path + dict(ENCODINGS)[encoding], data)
+
+    manifest = {
+        'generation': generation,
+        'base_url': base_url,
+        'encodings': available_encodings(),
+        'versions': versions,
+        'entries': {
+            key: {'name': entry['name'], 'etag': entry['etag'], 'last_modified': entry['last_modified']}
+            for key, entry in entries.items()
+        },
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.manifest-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(folder, MANIFEST))
+
+    # On garde la génération précédente pour les lectures en cours
+    keep = {generation, previous['generation'] if previous else None}
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if os.path.isdir(path) and name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def invalidate(folder):
+    """Remove the manifest: every request falls back to the dynamic routes."""
+    with locked(folder):
+        try:
+            os.remove(os.path.join(folder, MANIFEST))
+        except FileNotFoundError:
+            pass
+
+
+def read_manifest(folder):
+    try:
+        with open(os.path.join(folder, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class SnapshotStore:
+    """Read side: keeps the manifest in memory and reloads it when it changes."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._manifest = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def manifest(self):
+        try:
+            mtime = os.stat(os.path.join(self.folder, MANIFEST)).st_mtime_ns
+        except OSError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                self._manifest = read_manifest(self.folder)
+                self._mtime = mtime
+        return self._manifest
+
+    def lookup(self, key, base_url, accept_encodings):
+        """Return (entry, encoding, open file) for the best encoding accepted, or None.
+
+        The caller closes the file (or hands it to a response that does).
+        """
+        manifest = self.manifest()
+        if not manifest or manifest['base_url'] != base_url or key not in manifest['entries']:
+            return None
+        entry = manifest['entries'][key]
+
+        encoding = best_encoding(accept_encodings, manifest['encodings'])
+
+        path = os.path.join(self.folder, manifest['generation'], entry['name'] + '.json')
+        if encoding:
+            path += dict(ENCODINGS)[encoding]
+        try:
+            return entry, encoding, open(path, 'rb')
+        except OSError:
+            # Génération supprimée entre-temps : on retombe sur la route dynamique
+            return None
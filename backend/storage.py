@@ -0,0 +1,257 @@
+# storage.py - Stockage des images par contenu (SHA-256) sur disque
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import tempfile
+
+DATA_URI_RE = re.compile(r'^data:(?P<mimetype>[\w.+-]+/[\w.+-]+)?(?:;[\w-]+=[^;,]*)*;base64,', re.IGNORECASE)
+HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow est optionnel : pas de variantes sans lui
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Extension d'URL -> (format Pillow, mimetype)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+# Formats source qu'on sait redimensionner (SVG et GIF animés sont servis tels quels)
+RESIZABLE_MIMETYPES = ('image/png', 'image/jpeg', 'image/webp')
+# Formats acceptés à l'envoi : pas de SVG, qui peut contenir du script
+UPLOAD_MIMETYPES = ('image/png', 'image/jpeg', 'image/gif', 'image/webp')
+
+# Signatures des formats d'image acceptés
+MAGIC_NUMBERS = [
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+]
+
+
+# Octets lus pour reconnaître le format d'un fichier
+SNIFF_SIZE = 64
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+class ImageTooLarge(InvalidImage):
+    pass
+
+
+def sniff_mimetype(head):
+    """Return the image mimetype from the first bytes of a file, or None."""
+    for magic, mimetype in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return mimetype
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    stripped = head.lstrip()
+    if stripped.startswith(b'<svg') or stripped.startswith(b'<?xml'):
+        return 'image/svg+xml'
+    return None
+
+
+def is_accepted(head):
+    """Whether the first bytes of a file are an image format accepted for upload."""
+    return sniff_mimetype(head) in UPLOAD_MIMETYPES
+
+
+def is_data_uri(value):
+    return bool(value) and DATA_URI_RE.match(value) is not None
+
+
+def decode_data_uri(value):
+    """Decode a base64 data URI into raw bytes."""
+    match = DATA_URI_RE.match(value)
+    if not match:
+        raise InvalidImage('Not a base64 data URI')
+    try:
+        return base64.b64decode(value[match.end():], validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidImage('Invalid base64 image data')
+
+
+def blob_path(root, digest):
+    # Deux niveaux de répertoires pour ne pas saturer un seul dossier
+    return os.path.join(root, digest[:2], digest[2:4], digest)
+
+
+def blob_exists(root, digest):
+    return bool(HASH_RE.match(digest or '')) and os.path.isfile(blob_path(root, digest))
+
+
+def _atomic_write(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Écriture atomique : fichier temporaire puis rename
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def save_blob(root, data):
+    """Store bytes under their SHA-256 and return the hex digest."""
+    if not is_accepted(data[:SNIFF_SIZE]):
+        raise InvalidImage('Unsupported image format')
+
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(root, digest)
+    if os.path.isfile(path):
+        return digest
+
+    _atomic_write(path, lambda f: f.write(data))
+    return digest
+
+
+class BlobUpload:
+    """Temporary file in the blob store, hashed and size-checked while it is written.
+
+    Given to werkzeug's multipart parser as stream_factory, it receives the
+    uploaded file chunk by chunk: the format is checked on the first bytes and
+    the upload stops as soon as it exceeds `max_size`. save() then moves the
+    file to its content address.
+    """
+
+    def __init__(self, root, max_size):
+        self.root = root
+        self.max_size = max_size
+        self.size = 0
+        self._head = b''
+        self._sha256 = hashlib.sha256()
+        self._file = None
+        self._tmp_path = None
+
+    def stream_factory(self, total_content_length=None, content_type=None, filename=None, content_length=None):
+        if self._file is not None:
+            raise InvalidImage('Only one file can be uploaded')
+        os.makedirs(self.root, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        self._file = os.fdopen(fd, 'wb')
+        return self
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise ImageTooLarge(f'Image too large. Maximum size is {self.max_size // (1024 * 1024)}MB')
+        if len(self._head) < SNIFF_SIZE:
+            self._head += data[:SNIFF_SIZE - len(self._head)]
+            # Refus dès les premiers octets, sans attendre la fin de l'envoi
+            if len(self._head) == SNIFF_SIZE and not is_accepted(self._head):
+                raise InvalidImage('Unsupported image format')
+        self._sha256.update(data)
+        return self._file.write(data)
+
+    @property
+    def mimetype(self):
+        return sniff_mimetype(self._head)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # Appelé par werkzeug à la fin du fichier ; le contenu est relu depuis le disque
+        return self._file.seek(offset, whence)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def save(self):
+        """Move the uploaded file to its content address and return the hex digest."""
+        if self._file is None or self.size == 0:
+            raise InvalidImage('No image uploaded')
+        self._file.close()
+        if not is_accepted(self._head):
+            raise InvalidImage('Unsupported image format')
+
+        digest = self._sha256.hexdigest()
+        path = blob_path(self.root, digest)
+        if os.path.isfile(path):
+            os.unlink(self._tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._tmp_path, path)
+        self._tmp_path = None
+        return digest
+
+    def discard(self):
+        """Remove the temporary file if save() was not reached."""
+        self.close()
+        if self._tmp_path is not None and os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+        self._tmp_path = None
+
+
+def blob_mimetype(root, digest):
+    with open(blob_path(root, digest), 'rb') as f:
+        return sniff_mimetype(f.read(SNIFF_SIZE)) or 'application/octet-stream'
+
+
+def blob_data_uri(root, digest):
+    """Return a stored blob as a base64 data URI (inverse of decode_data_uri)."""
+    with open(blob_path(root, digest), 'rb') as f:
+        data = f.read()
+    mimetype = sniff_mimetype(data[:SNIFF_SIZE]) or 'application/octet-stream'
+    return f'data:{mimetype};base64,' + base64.b64encode(data).decode('ascii')
+
+
+def resizable(mimetype):
+    """Whether resized variants can be generated for an image of this mimetype."""
+    return Image is not None and mimetype in RESIZABLE_MIMETYPES
+
+
+def variants_supported(root, digest):
+    return resizable(blob_mimetype(root, digest))
+
+
+def variant_path(root, digest, width, ext):
+    return os.path.join(root, 'variants', digest[:2], digest[2:4], f'{digest}-{width}.{ext}')
+
+
+def _render_variant(original, path, width, ext):
+    pil_format = VARIANT_FORMATS[ext][0]
+    image = original.copy()
+    if image.width > width:
+        image.thumbnail((width, image.height), Image.LANCZOS)
+    if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    _atomic_write(path, lambda f: image.save(f, pil_format, quality=80, optimize=True))
+
+
+def generate_variant(root, digest, width, ext):
+    """Resize the original to `width` pixels (never upscaled) and cache it on disk."""
+    path = variant_path(root, digest, width, ext)
+    if not os.path.isfile(path):
+        with Image.open(blob_path(root, digest)) as original:
+            _render_variant(original, path, width, ext)
+    return path
+
+
+def generate_variants(root, digest, widths):
+    """Build every width/format variant of an image; run from the worker pool."""
+    if not variants_supported(root, digest):
+        return
+    # L'original n'est décodé qu'une fois pour toutes les variantes
+    with Image.open(blob_path(root, digest)) as original:
+        original.load()
+        for width in widths:
+            for ext in VARIANT_FORMATS:
+                path = variant_path(root, digest, width, ext)
+                if os.path.isfile(path):
+                    continue
+                try:
+                    _render_variant(original, path, width, ext)
+                except Exception:
+                    logger.exception('Error generating %spx %s variant of %s', width, ext, digest)
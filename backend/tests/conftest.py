@@ -0,0 +1,103 @@
+# conftest.py - Application sur une base SQLite et un dossier d'images temporaires
+# Lancer depuis backend/ : python -m pytest tests
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    # app.py lit sa configuration à l'import : l'environnement doit être prêt avant
+    tmp = tmp_path_factory.mktemp('portfolio')
+    os.environ['DATABASE_URI'] = f'sqlite:///{tmp}/test.db'
+    os.environ['UPLOAD_FOLDER'] = str(tmp / 'uploads')
+    os.environ['SNAPSHOT_FOLDER'] = str(tmp / 'snapshots')
+    os.environ['SNAPSHOTS'] = 'False'
+    os.environ['TRUSTED_PROXIES'] = '1'
+    os.environ['MAIL_QUEUE_WORKER'] = 'none'
+    os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    sys.path.insert(0, BACKEND)
+    import app as portfolio
+
+    portfolio.app.config['TESTING'] = True
+    with portfolio.app.app_context():
+        portfolio.db.create_all()
+        admin = portfolio.User(username='admin', email='admin@example.com', is_admin=True)
+        admin.set_password('password')
+        portfolio.db.session.add(admin)
+        portfolio.db.session.commit()
+    return portfolio.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(client):
+    response = client.post('/api/login', json={'username': 'admin', 'password': 'password'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(app, monkeypatch):
+    """Empty in-memory limiters and duplicate store for each test."""
+    import app as portfolio
+    import cache
+    import ratelimit
+
+    config = app.config
+    monkeypatch.setattr(portfolio, 'login_ip_limiter', ratelimit.make_limiter(
+        'local', config['LOGIN_IP_PER_MINUTE'], config['LOGIN_IP_BURST']))
+    monkeypatch.setattr(portfolio, 'login_user_limiter', ratelimit.make_limiter(
+        'local', config['LOGIN_USER_PER_MINUTE'], config['LOGIN_USER_BURST']))
+    monkeypatch.setattr(portfolio, 'contact_ip_limiter', ratelimit.make_sliding_window(
+        'local', config['CONTACT_IP_LIMIT'], config['CONTACT_IP_WINDOW']))
+    monkeypatch.setattr(portfolio, 'contact_email_limiter', ratelimit.make_sliding_window(
+        'local', config['CONTACT_EMAIL_LIMIT'], config['CONTACT_EMAIL_WINDOW']))
+    monkeypatch.setattr(portfolio, 'contact_fingerprints', cache.build_cache(
+        'local', config['CONTACT_DUPLICATE_WINDOW']))
+
+
+@pytest.fixture
+def budget_client(app, client, monkeypatch):
+    """Request function that fails when a request exceeds its view's @query_budget.
+
+    QUERY_BUDGET=raise, without snapshots, response cache or cached token
+    versions: every request runs its worst case. Statements run while a
+    streamed body is read are counted too.
+    """
+    import app as portfolio
+    from sqlalchemy import event
+
+    monkeypatch.setitem(app.config, 'QUERY_BUDGET', 'raise')
+    monkeypatch.setitem(app.config, 'SNAPSHOTS', False)
+    monkeypatch.setattr(portfolio, 'response_cache', None)
+    # Pas de contexte d'application autour des requêtes : chacune doit avoir son propre g
+    with app.app_context():
+        engine = portfolio.db.engine
+
+    def open(method, url, **kwargs):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        portfolio._token_versions.clear()
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            response = client.open(url, method=method, **kwargs)
+            response.get_data()
+            response.close()
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+        endpoint, _ = app.url_map.bind('').match(url.split('?')[0], method=method)
+        problems = portfolio.query_budget_problems(app.view_functions[endpoint], statements)
+        assert not problems, f'{method} {url}: ' + '; '.join(problems)
+        response.statement_count = len(statements)
+        return response
+    return open
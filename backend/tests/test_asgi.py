@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def asgi_app(app):
+    import asgi
+    return asgi.app
+
+
+def call(asgi_app, method, path, body=b'', headers=()):
+    """Run one HTTP request through the ASGI app; return (status, headers, body)."""
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost'), *((name.lower().encode(), value.encode()) for name, value in headers)],
+        'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start = sent[0]
+    response_headers = {name.decode().lower(): value.decode() for name, value in start['headers']}
+    return start['status'], response_headers, b''.join(message.get('body', b'') for message in sent[1:])
+
+
+PREFLIGHT = [
+    ('Origin', 'http://example.com'),
+    ('Access-Control-Request-Method', 'POST'),
+    ('Access-Control-Request-Headers', 'content-type'),
+]
+
+
+def test_contact_preflight_is_answered_by_flask(asgi_app, app):
+    for _ in range(app.config['CONTACT_IP_LIMIT'] + 1):
+        status, headers, body = call(asgi_app, 'OPTIONS', '/api/contact', headers=PREFLIGHT)
+        assert status == 200
+        assert headers['access-control-allow-origin'] in ('*', 'http://example.com')
+        assert 'POST' in headers['allow'] or 'POST' in headers.get('access-control-allow-methods', '')
+
+    # Les préflights ne consomment pas le quota de l'IP
+    message = {'name': 'Ada', 'email': 'ada@example.com', 'subject': 'Hello', 'message': 'From ASGI'}
+    status, _, _ = call(asgi_app, 'POST', '/api/contact', json.dumps(message).encode(),
+                        [('Content-Type', 'application/json')])
+    assert status == 201
+
+
+def test_options_on_a_list_has_no_body(asgi_app):
+    status, headers, body = call(asgi_app, 'OPTIONS', '/api/projects')
+    assert status == 200
+    assert 'GET' in headers['allow']
+    assert body == b''
+
+
+def test_contact_limit_uses_forwarded_client_address(asgi_app, app):
+    def post(email, client_ip):
+        body = json.dumps({'name': 'Ada', 'email': email, 'subject': 'Hello', 'message': f'From {client_ip}'})
+        return call(asgi_app, 'POST', '/api/contact', body.encode(),
+                    [('Content-Type', 'application/json'), ('X-Forwarded-For', client_ip)])[0]
+
+    for i in range(app.config['CONTACT_IP_LIMIT']):
+        assert post(f'asgi{i}@example.com', '203.0.113.7') == 201
+    assert post('asgi-more@example.com', '203.0.113.7') == 429
+    assert post('asgi-other@example.com', '203.0.113.8') == 201
+
+
+def test_not_modified_has_the_etag_of_the_full_response(asgi_app):
+    status, headers, _ = call(asgi_app, 'GET', '/api/projects', headers=[('Accept-Encoding', 'gzip')])
+    assert status == 200
+    etag = headers['etag']
+    assert etag.endswith('-gzip"')
+
+    status, headers, _ = call(asgi_app, 'GET', '/api/projects',
+                              headers=[('Accept-Encoding', 'gzip'), ('If-None-Match', etag)])
+    assert status == 304
+    assert headers['etag'] == etag
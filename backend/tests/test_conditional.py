@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.mark.parametrize('accept_encoding, suffix', [('gzip', '-gzip'), ('identity', '')])
+def test_not_modified_has_the_etag_of_the_full_response(client, accept_encoding, suffix):
+    for url in ('/api/tags', '/api/projects'):
+        response = client.get(url, headers={'Accept-Encoding': accept_encoding})
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert etag.endswith(f'{suffix}"')
+
+        response = client.get(url, headers={'Accept-Encoding': accept_encoding, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert 'Accept-Encoding' in response.headers['Vary']
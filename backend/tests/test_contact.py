@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def contact_count(app):
+    from app import Contact, db
+
+    def count():
+        with app.app_context():
+            return db.session.query(Contact).count()
+    return count
+
+
+def message(email='ada@example.com', **fields):
+    return {'name': 'Ada', 'email': email, 'subject': 'Hello', 'message': 'A question about a project', **fields}
+
+
+def send(client, data, client_ip='198.51.100.1'):
+    # TRUSTED_PROXIES=1 (conftest) : l'adresse du client vient du proxy
+    return client.post('/api/contact', json=data, headers={'X-Forwarded-For': client_ip})
+
+
+def test_valid_message_is_stored(client, contact_count):
+    before = contact_count()
+    assert send(client, message()).status_code == 201
+    assert contact_count() == before + 1
+
+
+def test_body_over_max_size_is_refused(app, client, contact_count):
+    before = contact_count()
+    body = json.dumps(message(message='x' * app.config['CONTACT_MAX_BODY_SIZE']))
+    response = client.post('/api/contact', data=body, content_type='application/json')
+    assert response.status_code == 413
+    assert contact_count() == before
+
+
+def test_ip_limit_is_per_client_behind_proxy(app, client):
+    limit = app.config['CONTACT_IP_LIMIT']
+    for i in range(limit):
+        assert send(client, message(f'sender{i}@example.com')).status_code == 201
+
+    response = send(client, message('one-more@example.com'))
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    # Un autre visiteur derrière le même proxy n'est pas bloqué
+    assert send(client, message('other@example.com'), client_ip='198.51.100.2').status_code == 201
+
+
+def test_honeypot_is_accepted_but_not_stored(app, client, contact_count):
+    before = contact_count()
+    response = send(client, message(**{app.config['CONTACT_HONEYPOT_FIELD']: 'http://spam.example'}))
+    assert response.status_code == 201
+    assert contact_count() == before
+
+
+def test_duplicate_message_is_stored_once(client, contact_count):
+    before = contact_count()
+    assert send(client, message()).status_code == 201
+    # Même message à la casse et aux espaces près
+    duplicate = message(message='  a QUESTION about a project ')
+    assert send(client, duplicate).status_code == 201
+    assert contact_count() == before + 1
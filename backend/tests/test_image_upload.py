@@ -0,0 +1,98 @@
+import base64
+import hashlib
+import io
+import os
+import struct
+import zlib
+
+
+def png(width, height):
+    """A valid RGB PNG stored without compression, about 3 bytes per pixel."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    pixels = b''.join(b'\0' + bytes((x + y) % 256 for x in range(3 * width)) for y in range(height))
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(pixels, 0))
+            + chunk(b'IEND', b''))
+
+
+def upload(client, headers, data):
+    return client.post('/api/images', data={'image': (io.BytesIO(data), 'photo.png')},
+                       headers=headers, content_type='multipart/form-data')
+
+
+def test_upload_image_of_several_hundred_kilobytes(client, admin_headers):
+    data = png(400, 300)
+    assert len(data) > 300 * 1024
+
+    response = upload(client, admin_headers, data)
+
+    assert response.status_code == 201
+    assert client.get(response.get_json()['url']).data == data
+
+
+def test_upload_image_over_max_size(app, client, admin_headers):
+    max_size = app.config['MAX_IMAGE_SIZE']
+    app.config['MAX_IMAGE_SIZE'] = 100 * 1024
+    try:
+        response = upload(client, admin_headers, png(400, 300))
+    finally:
+        app.config['MAX_IMAGE_SIZE'] = max_size
+
+    assert response.status_code == 413
+
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(localStorage.token)</script></svg>'
+
+
+def test_svg_upload_is_refused(client, admin_headers):
+    response = upload(client, admin_headers, SVG)
+    assert response.status_code == 400
+
+
+def test_svg_data_uri_is_refused(client, admin_headers):
+    image = 'data:image/svg+xml;base64,' + base64.b64encode(SVG).decode('ascii')
+    response = client.post('/api/projects', json={'title': 'Demo', 'description': 'SVG', 'image': image},
+                           headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_stored_svg_is_not_served_as_a_document(app, client):
+    import storage
+
+    # Blob écrit avant le refus des SVG (migration des anciennes data URIs)
+    digest = hashlib.sha256(SVG).hexdigest()
+    path = storage.blob_path(app.config['UPLOAD_FOLDER'], digest)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(SVG)
+
+    response = client.get(f'/api/images/{digest}')
+    assert response.status_code == 200
+    assert response.headers['Content-Security-Policy'] == 'sandbox'
+    assert response.headers['Content-Disposition'] == 'attachment'
+    assert response.headers['X-Content-Type-Options'] == 'nosniff'
+
+
+GIF = b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+
+
+def test_srcset_only_for_resizable_images(client, admin_headers):
+    import storage
+
+    gif = upload(client, admin_headers, GIF).get_json()
+    assert gif['srcset'] is None
+
+    project = client.post('/api/projects', json={'title': 'Demo', 'description': 'GIF', 'image': gif['url']},
+                          headers=admin_headers).get_json()
+    assert project['srcset'] is None
+    assert client.get(f"/api/projects/{project['id']}").get_json()['srcset'] is None
+
+    if storage.Image is not None:
+        png_upload = upload(client, admin_headers, png(40, 30)).get_json()
+        assert set(png_upload['srcset']) == set(storage.VARIANT_FORMATS)
+        response = client.put(f"/api/projects/{project['id']}", json={'image': png_upload['url']},
+                              headers=admin_headers)
+        assert response.get_json()['srcset'] == png_upload['srcset']
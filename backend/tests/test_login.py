@@ -0,0 +1,48 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+
+def login(client, username='admin', password='password', client_ip='198.51.100.1'):
+    return client.post('/api/login', json={'username': username, 'password': password},
+                       headers={'X-Forwarded-For': client_ip})
+
+
+def test_username_limit_returns_429_with_retry_after(app, client):
+    for _ in range(app.config['LOGIN_USER_BURST']):
+        assert login(client, password='wrong').status_code == 401
+
+    response = login(client, password='wrong')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_ip_limit_is_per_client_behind_proxy(app, client):
+    for i in range(app.config['LOGIN_IP_BURST']):
+        assert login(client, username=f'user{i}').status_code == 401
+
+    assert login(client, username='someone').status_code == 429
+    # Un autre client derrière le même proxy peut toujours se connecter
+    assert login(client, client_ip='198.51.100.2').status_code == 200
+
+
+@pytest.mark.parametrize('body', [{'username': 123, 'password': 'x'}, {'username': 'admin', 'password': ['x']}])
+def test_non_string_credentials_are_rejected(client, body):
+    assert client.post('/api/login', json=body).status_code == 400
+
+
+def test_login_rehashes_password_with_the_configured_method(app, client):
+    from app import User, db
+
+    with app.app_context():
+        user = User.query.filter_by(username='admin').first()
+        user.password_hash = generate_password_hash('password', method='pbkdf2:sha256:1000')
+        db.session.commit()
+        assert user.needs_rehash()
+
+    assert login(client).status_code == 200
+
+    with app.app_context():
+        user = User.query.filter_by(username='admin').first()
+        assert not user.needs_rehash()
+        assert user.password_hash.startswith(app.config['PASSWORD_HASH_METHOD'])
+    assert login(client, client_ip='198.51.100.3').status_code == 200
@@ -0,0 +1,141 @@
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+
+
+class Handler:
+    """Local SMTP stand-in: keeps the messages, refuses or hangs up on chosen recipients."""
+
+    def __init__(self):
+        self.messages = []
+        self.refused = set()
+        self.hang_up = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused:
+            return '550 Mailbox unavailable'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        if set(envelope.rcpt_tos) & self.hang_up:
+            return '421 Service not available, closing channel'
+        self.messages.append(envelope)
+        return '250 Message accepted'
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def outbox(app, monkeypatch):
+    from app import OutboxEmail, db
+
+    port = free_port()
+    monkeypatch.setitem(app.config, 'MAIL_SERVER', '127.0.0.1')
+    monkeypatch.setitem(app.config, 'MAIL_PORT', port)
+    monkeypatch.setitem(app.config, 'MAIL_USE_TLS', False)
+    monkeypatch.setitem(app.config, 'MAIL_USERNAME', None)
+    monkeypatch.setitem(app.config, 'MAIL_DEFAULT_SENDER', 'portfolio@example.com')
+    with app.app_context():
+        # Emails mis en file par les autres tests (formulaire de contact)
+        OutboxEmail.query.delete()
+        db.session.commit()
+        yield port
+        db.session.rollback()
+        OutboxEmail.query.delete()
+        db.session.commit()
+
+
+@pytest.fixture
+def smtp_server(outbox):
+    handler = Handler()
+    controller = aiosmtpd_controller.Controller(handler, hostname='127.0.0.1', port=outbox)
+    controller.start()
+    yield handler
+    controller.stop()
+
+
+def queue(*recipients):
+    from app import OutboxEmail, db, queue_email
+
+    for recipient in recipients:
+        queue_email(recipient, 'Hello', '<p>Hello</p>')
+    db.session.commit()
+    return OutboxEmail.query.order_by(OutboxEmail.id).all()
+
+
+def test_due_emails_are_sent(smtp_server):
+    from app import deliver_outbox
+
+    emails = queue('ada@example.com', 'alan@example.com')
+    assert deliver_outbox() == 2
+    assert [email.status for email in emails] == ['sent', 'sent']
+    assert all(email.sent_at and email.attempts == 1 for email in emails)
+    assert [envelope.rcpt_tos for envelope in smtp_server.messages] == [['ada@example.com'], ['alan@example.com']]
+
+
+def test_refused_email_is_retried_with_backoff(app, smtp_server):
+    from app import db, deliver_outbox
+
+    smtp_server.refused.add('ada@example.com')
+    refused, accepted = queue('ada@example.com', 'alan@example.com')
+    delay = app.config['MAIL_RETRY_DELAY']
+
+    assert deliver_outbox() == 1
+    assert (refused.status, refused.attempts) == ('pending', 1)
+    assert '550' in refused.last_error
+    assert refused.next_attempt_at - datetime.utcnow() == pytest.approx(timedelta(seconds=delay), abs=timedelta(seconds=5))
+    assert accepted.status == 'sent'
+
+    # Pas encore dû : rien n'est renvoyé
+    assert deliver_outbox() == 0
+    assert refused.attempts == 1
+
+    refused.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    assert deliver_outbox() == 0
+    assert refused.attempts == 2
+    assert refused.next_attempt_at - datetime.utcnow() == pytest.approx(timedelta(seconds=2 * delay), abs=timedelta(seconds=5))
+
+
+def test_email_fails_after_max_attempts(app, smtp_server):
+    from app import db, deliver_outbox
+
+    smtp_server.refused.add('ada@example.com')
+    email, = queue('ada@example.com')
+    email.attempts = app.config['MAIL_MAX_ATTEMPTS'] - 1
+    db.session.commit()
+
+    assert deliver_outbox() == 0
+    assert (email.status, email.attempts) == ('failed', app.config['MAIL_MAX_ATTEMPTS'])
+
+
+def test_unreachable_server_leaves_emails_untouched(outbox):
+    from app import deliver_outbox
+
+    # Aucun serveur n'écoute sur le port
+    emails = queue('ada@example.com', 'alan@example.com')
+    assert deliver_outbox() == 0
+    assert [(email.status, email.attempts) for email in emails] == [('pending', 0), ('pending', 0)]
+
+
+def test_lost_connection_reschedules_rest_of_batch(app, smtp_server):
+    from app import deliver_outbox
+
+    smtp_server.hang_up.add('alan@example.com')
+    sent, dropped, rest = queue('ada@example.com', 'alan@example.com', 'grace@example.com')
+
+    assert deliver_outbox() == 1
+    assert sent.status == 'sent'
+    assert (dropped.status, dropped.attempts) == ('pending', 1)
+    # Reporté sans tentative comptée, et pas renvoyé sur une nouvelle connexion
+    assert (rest.status, rest.attempts) == ('pending', 0)
+    assert rest.next_attempt_at > datetime.utcnow()
+    assert len(smtp_server.messages) == 1
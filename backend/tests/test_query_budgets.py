@@ -0,0 +1,108 @@
+import base64
+import io
+import json
+
+from test_image_upload import png
+
+
+def png_data_uri():
+    return 'data:image/png;base64,' + base64.b64encode(png(8, 8)).decode('ascii')
+
+
+def ndjson(records):
+    return '\n'.join(json.dumps(record) for record in records) + '\n'
+
+
+def test_every_route_declares_a_budget(app):
+    missing = [rule.rule for rule in app.url_map.iter_rules()
+               if rule.endpoint != 'static' and not hasattr(app.view_functions[rule.endpoint], 'query_budget')]
+    assert missing == []
+
+
+def test_read_routes(budget_client, admin_headers):
+    import app as portfolio
+
+    project = budget_client('POST', '/api/projects', headers=admin_headers, json={
+        'title': 'Budget', 'description': 'Read routes', 'tags': ['python', 'flask']})
+    urls = portfolio.QUERY_BUDGET_CHECKS + [
+        f"/api/projects/{project.get_json()['id']}", '/api/bulk/projects', '/api/bulk/skills']
+    for url in urls:
+        assert budget_client('GET', url, headers=admin_headers).status_code == 200, url
+
+
+def test_project_writes(budget_client, admin_headers):
+    response = budget_client('POST', '/api/projects', headers=admin_headers, json={
+        'title': 'Budget', 'description': 'Writes', 'image': png_data_uri(), 'tags': ['python', 'sql', 'new']})
+    assert response.status_code == 201
+    url = f"/api/projects/{response.get_json()['id']}"
+
+    response = budget_client('PUT', url, headers=admin_headers, json={
+        'title': 'Budget 2', 'description': 'Updated', 'tags': ['sql', 'other'], 'featured': True})
+    assert response.status_code == 200
+
+    response = budget_client('PUT', url + '/image', headers=admin_headers, content_type='multipart/form-data',
+                             data={'image': (io.BytesIO(png(16, 16)), 'photo.png')})
+    assert response.status_code == 200
+
+    assert budget_client('DELETE', url, headers=admin_headers).status_code == 200
+
+
+def test_skill_writes(budget_client, admin_headers):
+    response = budget_client('POST', '/api/skills', headers=admin_headers,
+                             json={'name': 'SQL', 'level': 80, 'category': 'backend'})
+    assert response.status_code == 201
+    url = f"/api/skills/{response.get_json()['id']}"
+
+    assert budget_client('PUT', url, headers=admin_headers, json={'level': 90}).status_code == 200
+    assert budget_client('DELETE', url, headers=admin_headers).status_code == 200
+
+
+def test_contact_routes(app, budget_client, admin_headers):
+    from app import Contact
+
+    response = budget_client('POST', '/api/contact', headers={'X-Forwarded-For': '198.51.100.50'}, json={
+        'name': 'Ada', 'email': 'budget@example.com', 'subject': 'Budget', 'message': 'Checking the query budget'})
+    assert response.status_code == 201
+    with app.app_context():
+        contact_id = Contact.query.filter_by(email='budget@example.com').one().id
+
+    assert budget_client('PUT', f'/api/contacts/{contact_id}', headers=admin_headers).status_code == 200
+    assert budget_client('DELETE', f'/api/contacts/{contact_id}', headers=admin_headers).status_code == 200
+
+
+def test_login_and_images(budget_client, admin_headers):
+    response = budget_client('POST', '/api/login', json={'username': 'admin', 'password': 'password'})
+    assert response.status_code == 200
+
+    response = budget_client('POST', '/api/images', headers=admin_headers, content_type='multipart/form-data',
+                             data={'image': (io.BytesIO(png(16, 16)), 'photo.png')})
+    assert response.status_code == 201
+    digest = response.get_json()['hash']
+    assert budget_client('GET', f'/api/images/{digest}').status_code == 200
+    assert budget_client('GET', f'/api/images/{digest}/320.webp').status_code in (200, 302)
+
+
+def test_bulk_import_statements_do_not_grow_with_rows(app, budget_client, admin_headers, monkeypatch):
+    from app import db
+
+    # Sans budget fixe : un lot coûte le même nombre de requêtes quel que soit son nombre de lignes
+    monkeypatch.setitem(app.config, 'BULK_BATCH_SIZE', 1000)
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    counts = []
+    for size in (2, 20):
+        projects = [{'title': f'Bulk {size} {i}', 'description': 'Imported', 'tags': [f'bulk-{i % 3}']}
+                    for i in range(size)]
+        response = budget_client('POST', '/api/bulk/projects', headers=admin_headers,
+                                 data=ndjson(projects), content_type='application/x-ndjson')
+        assert response.get_json()['created'] == size
+        counts.append(response.statement_count)
+    # Sauf sur SQLite : sans sentinelle implicite pour RETURNING dans l'ordre des lignes,
+    # SQLAlchemy y insère les projets un par un (PostgreSQL les regroupe)
+    per_row = 1 if dialect == 'sqlite' else 0
+    assert counts[1] - counts[0] == per_row * 18
+
+    skills = [{'name': f'Bulk {i}', 'level': 50, 'category': 'backend'} for i in range(20)]
+    response = budget_client('POST', '/api/bulk/skills', headers=admin_headers,
+                             data=ndjson(skills), content_type='application/x-ndjson')
+    assert response.get_json()['created'] == 20
@@ -0,0 +1,41 @@
+// Writes .br and .gz siblings of the text assets of a build, served by the Flask
+// backend (send_static) to clients that accept them.
+// Usage: node scripts/compress.js [dir]   (default: dist, run by `npm run build`)
+import { readdirSync, readFileSync, statSync, writeFileSync } from 'node:fs';
+import { extname, join } from 'node:path';
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib';
+
+const COMPRESSIBLE = new Set(['.html', '.js', '.css', '.svg', '.json', '.txt', '.xml', '.map']);
+// Below this size the encoded headers cost more than what compression saves
+const MIN_SIZE = 1024;
+
+const walk = (dir) =>
+  readdirSync(dir).flatMap((name) => {
+    const path = join(dir, name);
+    return statSync(path).isDirectory() ? walk(path) : [path];
+  });
+
+const root = process.argv[2] ?? 'dist';
+let written = 0;
+for (const path of walk(root)) {
+  if (!COMPRESSIBLE.has(extname(path))) continue;
+  const data = readFileSync(path);
+  if (data.length < MIN_SIZE) continue;
+
+  const variants = {
+    '.br': brotliCompressSync(data, {
+      params: {
+        [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+        [constants.BROTLI_PARAM_SIZE_HINT]: data.length,
+      },
+    }),
+    '.gz': gzipSync(data, { level: 9 }),
+  };
+  for (const [extension, compressed] of Object.entries(variants)) {
+    if (compressed.length < data.length) {
+      writeFileSync(path + extension, compressed);
+      written += 1;
+    }
+  }
+}
+console.log(`Precompressed ${written} files in ${root}`);
@@ -12,20 +12,74 @@ interface Contact {
   created_at: string;
 }
 
+interface ContactPage {
+  items: Contact[];
+  next_cursor: string | null;
+}
+
+interface SearchResults {
+  contacts: Contact[];
+}
+
+const PAGE_SIZE = 50;
+const SEARCH_LIMIT = 50;
+const SEARCH_MIN_LENGTH = 2;
+
 const AdminContacts: React.FC = () => {
   const [contacts, setContacts] = useState<Contact[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [selectedContact, setSelectedContact] = useState<Contact | null>(null);
   const [searchTerm, setSearchTerm] = useState<string>('');
+  const [searchResults, setSearchResults] = useState<Contact[] | null>(null);
   const [filterStatus, setFilterStatus] = useState<'all' | 'read' | 'unread'>('all');
   const [deleteConfirm, setDeleteConfirm] = useState<number | null>(null);
+  const [unreadCount, setUnreadCount] = useState<number>(0);
 
   useEffect(() => {
     fetchContacts();
+    fetchUnreadCount();
   }, []);
 
-  const fetchContacts = async () => {
+  // La recherche interroge l'index plein texte de l'API (tous les messages, pas seulement les pages chargées)
+  useEffect(() => {
+    const term = searchTerm.trim();
+    if (term.length < SEARCH_MIN_LENGTH) {
+      setSearchResults(null);
+      return;
+    }
+
+    const timeout = setTimeout(async () => {
+      try {
+        const token = localStorage.getItem('jwtToken');
+        const response = await fetch(
+          `${API_BASE_URL}/search?q=${encodeURIComponent(term)}&type=contacts&limit=${SEARCH_LIMIT}`,
+          {
+            headers: {
+              'Authorization': `Bearer ${token}`,
+              'Content-Type': 'application/json',
+            },
+          }
+        );
+
+        if (!response.ok) {
+          throw new Error('Failed to search contacts');
+        }
+
+        const data: SearchResults = await response.json();
+        setSearchResults(data.contacts);
+      } catch (err) {
+        setError(err instanceof Error ? err.message : 'Failed to search contacts');
+      }
+    }, 300);
+
+    return () => clearTimeout(timeout);
+  }, [searchTerm]);
+
+  // Les messages sont chargés page par page (pagination par curseur côté API)
+  const fetchContacts = async (cursor: string | null = null) => {
     try {
       const token = localStorage.getItem('jwtToken');
       if (!token) {
@@ -33,7 +87,12 @@ const AdminContacts: React.FC = () => {
         return;
       }
 
-      const response = await fetch(`${API_BASE_URL}/contacts`, {
+      let url = `${API_BASE_URL}/contacts?limit=${PAGE_SIZE}`;
+      if (cursor) {
+        url += `&cursor=${encodeURIComponent(cursor)}`;
+      }
+
+      const response = await fetch(url, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json',
@@ -44,8 +103,9 @@ const AdminContacts: React.FC = () => {
         throw new Error('Failed to fetch contacts');
       }
 
-      const data = await response.json();
-      setContacts(data);
+      const data: ContactPage = await response.json();
+      setContacts(previous => cursor ? [...previous, ...data.items] : data.items);
+      setNextCursor(data.next_cursor);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An error occurred');
     } finally {
@@ -53,6 +113,32 @@ const AdminContacts: React.FC = () => {
     }
   };
 
+  // Compté par l'API sur tous les messages, pas seulement sur les pages chargées
+  const fetchUnreadCount = async () => {
+    try {
+      const token = localStorage.getItem('jwtToken');
+      const response = await fetch(`${API_BASE_URL}/contacts/unread-count`, {
+        headers: {
+          'Authorization': `Bearer ${token}`,
+        },
+      });
+
+      if (response.ok) {
+        const data = await response.json();
+        setUnreadCount(data.unread);
+      }
+    } catch (err) {
+      console.log('Could not fetch unread count:', err);
+    }
+  };
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    await fetchContacts(nextCursor);
+    setLoadingMore(false);
+  };
+
   const markAsRead = async (contactId: number) => {
     try {
       const token = localStorage.getItem('jwtToken');
@@ -68,9 +154,11 @@ const AdminContacts: React.FC = () => {
         throw new Error('Failed to mark as read');
       }
 
-      setContacts(contacts.map(contact => 
-        contact.id === contactId ? { ...contact, read: true } : contact
-      ));
+      const markRead = (contact: Contact) =>
+        contact.id === contactId ? { ...contact, read: true } : contact;
+      setContacts(contacts.map(markRead));
+      setSearchResults(results => results && results.map(markRead));
+      fetchUnreadCount();
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to mark as read');
     }
@@ -92,10 +180,12 @@ const AdminContacts: React.FC = () => {
       }
 
       setContacts(contacts.filter(contact => contact.id !== contactId));
+      setSearchResults(results => results && results.filter(contact => contact.id !== contactId));
       setDeleteConfirm(null);
       if (selectedContact?.id === contactId) {
         setSelectedContact(null);
       }
+      fetchUnreadCount();
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to delete contact');
     }
@@ -118,21 +208,11 @@ const AdminContacts: React.FC = () => {
     });
   };
 
-  const filteredContacts = contacts.filter(contact => {
-    const matchesSearch = 
-      contact.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      contact.email.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      contact.subject.toLowerCase().includes(searchTerm.toLowerCase());
-    
-    const matchesFilter = 
-      filterStatus === 'all' || 
-      (filterStatus === 'read' && contact.read) ||
-      (filterStatus === 'unread' && !contact.read);
-
-    return matchesSearch && matchesFilter;
-  });
-
-  const unreadCount = contacts.filter(contact => !contact.read).length;
+  const filteredContacts = (searchResults ?? contacts).filter(contact =>
+    filterStatus === 'all' || 
+    (filterStatus === 'read' && contact.read) ||
+    (filterStatus === 'unread' && !contact.read)
+  );
 
   if (loading) {
     return (
@@ -271,6 +351,17 @@ const AdminContacts: React.FC = () => {
                 ))}
               </div>
             )}
+            {nextCursor && searchResults === null && (
+              <div className="p-4 border-t border-gray-200 dark:border-gray-700 text-center">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="px-4 py-2 text-sm font-medium text-blue-600 dark:text-blue-400 hover:underline disabled:opacity-50"
+                >
+                  {loadingMore ? 'Chargement...' : 'Charger plus de messages'}
+                </button>
+              </div>
+            )}
           </div>
         </div>
 
@@ -39,15 +39,14 @@ const validateToken = async () => {
       setIsAuthenticated(true);
       // Essayez de récupérer les contacts, mais ne bloquez pas si ça échoue
       try {
-        const contactsResponse = await fetch(`${API_BASE_URL}/contacts`, {
+        const contactsResponse = await fetch(`${API_BASE_URL}/contacts/unread-count`, {
           headers: {
             'Authorization': `Bearer ${token}`
           }
         });
         if (contactsResponse.ok) {
           const data = await contactsResponse.json();
-          const unread = data.filter((contact: any) => !contact.read).length;
-          setUnreadCount(unread);
+          setUnreadCount(data.unread);
         }
       } catch (contactError) {
         console.log('Could not fetch contacts:', contactError);
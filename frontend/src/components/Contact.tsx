@@ -7,6 +7,8 @@ interface FormData {
   email: string;
   subject: string;
   message: string;
+  // Hidden honeypot field: only bots fill it in (the API drops those submissions)
+  website: string;
 }
 
 interface ApiResponse {
@@ -18,6 +20,7 @@ const initialFormData: FormData = {
   email: '',
   subject: '',
   message: '',
+  website: '',
 };
 
 const Contact: React.FC = () => {
@@ -246,6 +249,7 @@ const Contact: React.FC = () => {
                       name="name"
                       value={formData.name}
                       onChange={handleChange}
+                      maxLength={100}
                       className={`w-full px-4 py-3 rounded-lg border ${
                         errors.name ? 'border-red-500 dark:border-red-400' : 'border-gray-300 dark:border-gray-600'
                       } focus:outline-none focus:ring-2 focus:ring-blue-500 dark:bg-gray-700 dark:text-white`}
@@ -266,6 +270,7 @@ const Contact: React.FC = () => {
                       name="email"
                       value={formData.email}
                       onChange={handleChange}
+                      maxLength={120}
                       className={`w-full px-4 py-3 rounded-lg border ${
                         errors.email ? 'border-red-500 dark:border-red-400' : 'border-gray-300 dark:border-gray-600'
                       } focus:outline-none focus:ring-2 focus:ring-blue-500 dark:bg-gray-700 dark:text-white`}
@@ -287,6 +292,7 @@ const Contact: React.FC = () => {
                     name="subject"
                     value={formData.subject}
                     onChange={handleChange}
+                    maxLength={200}
                     className={`w-full px-4 py-3 rounded-lg border ${
                       errors.subject ? 'border-red-500 dark:border-red-400' : 'border-gray-300 dark:border-gray-600'
                     } focus:outline-none focus:ring-2 focus:ring-blue-500 dark:bg-gray-700 dark:text-white`}
@@ -306,6 +312,7 @@ const Contact: React.FC = () => {
                     name="message"
                     value={formData.message}
                     onChange={handleChange}
+                    maxLength={5000}
                     rows={5}
                     className={`w-full px-4 py-3 rounded-lg border ${
                       errors.message ? 'border-red-500 dark:border-red-400' : 'border-gray-300 dark:border-gray-600'
@@ -317,6 +324,19 @@ const Contact: React.FC = () => {
                   )}
                 </div>
                 
+                <div className="absolute -left-[10000px]" aria-hidden="true">
+                  <label htmlFor="website">Website</label>
+                  <input
+                    type="text"
+                    id="website"
+                    name="website"
+                    value={formData.website}
+                    onChange={handleChange}
+                    tabIndex={-1}
+                    autoComplete="off"
+                  />
+                </div>
+                
                 <button
                   type="submit"
                   disabled={isSubmitting}
@@ -161,7 +161,7 @@ const CreateProject: React.FC = () => {
     setNewTag('');
   };
 
-  const handleImageUpload = (e: React.ChangeEvent<HTMLInputElement>) => {
+  const handleImageUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
     const file = e.target.files?.[0];
     if (!file) return;
 
@@ -171,33 +171,43 @@ const CreateProject: React.FC = () => {
       return;
     }
 
-    // Vérifier la taille du fichier (max 5MB)
-    if (file.size > 5 * 1024 * 1024) {
-      setErrors({ ...errors, image: 'File size must be less than 5MB' });
+    // Vérifier la taille du fichier (max 10MB, comme le serveur)
+    if (file.size > 10 * 1024 * 1024) {
+      setErrors({ ...errors, image: 'File size must be less than 10MB' });
       return;
     }
 
     setIsLoading(true);
     
-    const reader = new FileReader();
-    reader.onloadend = () => {
-      const imageUrl = reader.result as string;
-      setImagePreview(imageUrl);
-      setFormData({ ...formData, image: imageUrl });
-      setIsLoading(false);
+    // Envoi du fichier brut en multipart : le projet ne reçoit ensuite que l'URL de l'image
+    try {
+      const body = new FormData();
+      body.append('image', file);
+      const response = await fetch(`${API_BASE_URL}/images`, {
+        method: 'POST',
+        headers: {
+          'Authorization': `Bearer ${localStorage.getItem('jwtToken')}`
+        },
+        body
+      });
+      const data = await response.json().catch(() => ({}));
+      if (!response.ok) {
+        setErrors({ ...errors, image: data.message || 'Failed to upload image' });
+        return;
+      }
+      
+      setImagePreview(data.url);
+      setFormData({ ...formData, image: data.url });
       
       // Clear image error
       if (errors.image) {
         setErrors({ ...errors, image: '' });
       }
-    };
-    
-    reader.onerror = () => {
-      setErrors({ ...errors, image: 'Failed to read file' });
+    } catch {
+      setErrors({ ...errors, image: 'Failed to upload image' });
+    } finally {
       setIsLoading(false);
-    };
-    
-    reader.readAsDataURL(file);
+    }
   };
 
   const validateForm = () => {
@@ -461,7 +471,7 @@ const CreateProject: React.FC = () => {
                       <>
                         <Upload className="mx-auto h-12 w-12 text-gray-400" />
                         <p className="mt-2 text-sm text-gray-500 dark:text-gray-400">
-                          Upload an image for your project (max 5MB)
+                          Upload an image for your project (max 10MB)
                         </p>
                         <label
                           htmlFor="actual-upload"
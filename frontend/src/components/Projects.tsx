@@ -5,8 +5,9 @@ import API_BASE_URL from '../config/api';
 interface Project {
   id: number;
   title: string;
-  description: string;
+  excerpt: string;
   image: string;
+  srcset: { webp: string; jpg: string } | null;
   tags: string[];
   demoUrl: string;
   repoUrl: string;
@@ -17,11 +18,19 @@ const ProjectCard: React.FC<{ project: Project }> = ({ project }) => {
   return (
     <div className="rounded-xl overflow-hidden bg-white shadow-lg hover:shadow-xl transition-all duration-300 dark:bg-gray-800 group">
       <div className="relative overflow-hidden">
-        <img 
-          src={project.image} 
-          alt={project.title} 
-          className="w-full h-64 object-cover object-center transition-transform duration-700 group-hover:scale-110"
-        />
+        <picture>
+          {project.srcset && (
+            <source type="image/webp" srcSet={project.srcset.webp} sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw" />
+          )}
+          <img 
+            src={project.image} 
+            srcSet={project.srcset?.jpg}
+            sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+            alt={project.title} 
+            loading="lazy"
+            className="w-full h-64 object-cover object-center transition-transform duration-700 group-hover:scale-110"
+          />
+        </picture>
         <div className="absolute inset-0 bg-gradient-to-t from-black/70 to-transparent opacity-0 group-hover:opacity-100 transition-opacity duration-300 flex items-end">
           <div className="p-6 w-full">
             <div className="flex gap-4 justify-end">
@@ -58,7 +67,7 @@ const ProjectCard: React.FC<{ project: Project }> = ({ project }) => {
       </div>
       <div className="p-6">
         <h3 className="text-xl font-semibold mb-2 dark:text-white">{project.title}</h3>
-        <p className="text-gray-600 mb-4 line-clamp-2 dark:text-gray-300">{project.description}</p>
+        <p className="text-gray-600 mb-4 line-clamp-2 dark:text-gray-300">{project.excerpt}</p>
         <div className="flex flex-wrap gap-2">
           {project.tags.map((tag) => (
             <span 
@@ -104,11 +113,12 @@ const Projects: React.FC = () => {
       setLoading(true);
       try {
         // Construct URL based on filter
-        let url = `${API_BASE_URL}/projects`;
+        // La grille n'a besoin que de la vue résumé (pas de description complète)
+        let url = `${API_BASE_URL}/projects?view=summary`;
         if (filter === 'featured') {
-          url += '?featured=true';
+          url += '&featured=true';
         } else if (filter !== 'all') {
-          url += `?tag=${filter}`;
+          url += `&tag=${encodeURIComponent(filter)}`;
         }
 
         const response = await fetch(url);